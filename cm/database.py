@@ -56,7 +56,12 @@ class DatabaseCtx(object):
         self.db_info = DATABASE[dbname]
         if truthy(self.db_info.get('sql_tracing')):
             dblog.setLevel(logging.INFO)
-        self.eng  = create_engine(self.db_info['connect_str'])
+        # compiled forms of executed statements are cached by SQLAlchemy (keyed by statement
+        # object), so statements that are built once and reused (see musiclib.MusicEnt) skip
+        # the compile step; note, set on the engine so that no Connection clones are needed
+        self.compiled_cache = {}
+        self.eng  = create_engine(self.db_info['connect_str'],
+                                  execution_options={'compiled_cache': self.compiled_cache})
         self.conn = self.eng.connect()
         self.meta = MetaData(self.conn, reflect=True)
 
@@ -6,7 +6,10 @@
 import sys
 import regex as re
 import datetime as dt
-from collections import UserDict
+from collections import UserDict, Counter
+from contextlib import contextmanager
+from bisect import bisect_left
+from unicodedata import category
 import warnings
 
 from sqlalchemy import bindparam
@@ -17,7 +20,8 @@ from sqlalchemy.exc import *
 
 from core import cfg, env, log, dbg_hand
 from database import DatabaseCtx
-from utils import LOV, prettyprint, strtype, collecttype, mappingtype, str_similarity
+from utils import (LOV, LRUCache, prettyprint, strtype, collecttype, mappingtype,
+                   str_similarity)
 
 ##############################
 # common constants/functions #
@@ -71,6 +75,10 @@ child_recs = {
     'play_ensemble' : []
 }
 
+# freeze the key/field sets (these are constant, and used for every select/insert)
+user_keys  = {k: frozenset(v) for k, v in user_keys.items()}
+child_recs = {k: frozenset(v) for k, v in child_recs.items()}
+
 def clean_user_keys(data, entity):
     """Remove empty strings in user keys (set to None)
 
@@ -88,7 +96,7 @@ def key_data(data, entity):
     :param entity: [string] name of entity
     :return: dict comprehension for key data elements
     """
-    return {k: data[k] for k in set(data.keys()) & user_keys[entity]}
+    return {k: data[k] for k in user_keys[entity] if k in data}
 
 def entity_data(data, entity):
     """Return elements of entity data, excluding embedded child records (and later,
@@ -98,7 +106,8 @@ def entity_data(data, entity):
     :param entity: [string] name of entity
     :return: dict comprehension for entity data elements
     """
-    return {k: v for k, v in data.items() if k not in child_recs[entity]}
+    excl = child_recs[entity]
+    return {k: v for k, v in data.items() if k not in excl}
 
 class ml_dict(UserDict):
     """Manage data structure of this form:
@@ -117,19 +126,44 @@ class ml_dict(UserDict):
       - In particular, knows relationship between conductor, performers, and ensembles
         when merging
     """
+    def __init__(self, data = None):
+        """Shallow-copies data into the underlying dict in one step (UserDict.__init__()
+        copies items in one at a time, through __setitem__)
+
+        :param data: dict (or other mapping) to initialize from
+        """
+        self.data = dict(data) if data else {}
+
+    @classmethod
+    def from_keys(cls, keys):
+        """Create instance with an empty list for each of the specified keys (sets the
+        underlying dict directly, rather than copying items in through UserDict.__init__)
+
+        :param keys: iterable of keys
+        :return: new ml_dict
+        """
+        new = cls.__new__(cls)
+        new.data = {k: [] for k in keys}
+        return new
+
     @staticmethod
     def deep_replace(d, from_str, to_str):
-        """String replacement throughout structure
+        """String replacement throughout structure (walked iteratively, using an explicit
+        stack of nested mappings)
         """
-        for k, v in d.items():
-            if mappingtype(v):
-                ml_dict.deep_replace(v, from_str, to_str)
-            elif collecttype(v):
-                for m in v:
-                    if mappingtype(m):
-                        ml_dict.deep_replace(m, from_str, to_str)
-            elif strtype(v):
-                d[k] = v.replace(from_str, to_str)
+        stack = [d]
+        while stack:
+            cur = stack.pop()
+            for k, v in cur.items():
+                # note, test for (the common) str values first, to avoid the ABC-based
+                # isinstance() check in mappingtype()
+                if strtype(v):
+                    if from_str in v:
+                        cur[k] = v.replace(from_str, to_str)
+                elif mappingtype(v):
+                    stack.append(v)
+                elif collecttype(v):
+                    stack.extend(m for m in v if mappingtype(m))
 
     def merge(self, to_merge):
         """Modifies current structure in place (no return value)
@@ -167,6 +201,9 @@ COND_STRS = {'conductor',
 SKIP_ENS = {'ensemble',
             'soloists'}
 
+# keys for parse_performer_str()/parse_ensemble_str() return data
+ENS_PERF_KEYS = ('ensembles', 'performers')
+
 SUFFIX_TOKEN = '{{SUFFIX}}'
 UNIDENT      = '{{UNIDENT}}'
 
@@ -180,6 +217,63 @@ BRACKETS = {'"': '"',
 
 DELIMS = {}
 
+DUP_WS_PTRN      = re.compile(r'\s{2,}')
+SQ_PAIR_PTRN     = re.compile(r"'([^']*)'")
+# major delimiters '/', ';', ' - ', ' * ', ' & ' (mandatory spaces as indicated, otherwise
+# optional space both before and after), and comma (optional spaces)
+MAJ_DELIMS_PTRN  = re.compile(r'( ?\/ ?| ?\; ?| \- | \* | \& )')
+COMMA_DELIM_PTRN = re.compile(r'( ?, ?)')
+WORD_CHAR_PTRN   = re.compile(r'\w')
+
+# parse_person_str() patterns
+PERS_SUFFIX_PTRN = re.compile(r'(,? (?:Jr|Sr)\.?)(?:\W|$)', flags=re.I)
+LAST_FIRST_PTRN  = re.compile(r'([\w\ufffd<>-]+),((?:\s+[\w\ufffd-]+)+)')
+COND_ROLE_PTRN   = re.compile(r'(.+), ([\w\./ ]+)')
+
+# parse_performer_str()/parse_ensemble_str() patterns
+BROKEN_REC_PTRN  = re.compile(r'(.+?)\r')
+BROKEN_ROLE_PTRN = re.compile(r'(.+)\[(.+)\],(.+)')
+SLASH_PERF_PTRN  = re.compile(r'\/.+ \- ')
+
+def maybe_dup_ws(s):
+    """Cheap pre-check (plain string scans) for whether DUP_WS_PTRN may match--note that
+    all whitespace other than ASCII space is non-printable, so there are no false negatives
+
+    :param s: string to check
+    :return: bool
+    """
+    return '  ' in s or not s.isprintable()
+
+def has_word_char(s):
+    """Equivalent to WORD_CHAR_PTRN.search(s) (as bool), but with a fast path for leading
+    ASCII chars (the common case)--note that str.isalnum() does not match the regex
+    definition of a word char outside of ASCII, so we defer to the regex in that case
+
+    :param s: string to check
+    :return: bool
+    """
+    for c in s:
+        if not c.isascii():
+            return WORD_CHAR_PTRN.search(s) is not None
+        if c.isalnum() or c == '_':
+            return True
+    return False
+
+def charset_fixups(ent_str):
+    """Replacement char and whitespace fixups (each only applied if a cheap scan says it
+    may be needed, which is the uncommon case)
+
+    :param ent_str: entity string
+    :return: tuple of (fixed-up string, repl char fixed [bool], whitespace collapsed [bool])
+    """
+    repl_fixed = REPL_CHAR_8 in ent_str
+    if repl_fixed:
+        ent_str = ent_str.replace(REPL_CHAR_8, REPL_CHAR_16)
+    dup_whitespace = 0
+    if maybe_dup_ws(ent_str):
+        ent_str, dup_whitespace = DUP_WS_PTRN.subn(' ', ent_str)
+    return ent_str, repl_fixed, dup_whitespace > 0
+
 NAME_RE   = r'[\p{L}\.,\' -]+'
 ROLE_RE   = r'[\p{L}\.\'\(\)\/ -]+'
 ROLE_RE2  = r'[\p{L}\.\'\(\)\/\, -]+'  # comma added for bracketed case
@@ -196,6 +290,60 @@ ParseFlag = LOV({'COMPOSER' : 0x0001,
                  'PERSON'   : 0x0007,
                  'TITLE'    : 0x0050})
 
+# entity_ref lookups (NER) by stripped entity string, the same strings tend to recur
+# heavily within and across playlists (note, None is cached for misses)
+ent_type_cache = {}
+
+def get_entity_type(substr):
+    """
+    :param substr: item to lookup [string]
+    :return: type [string], or None if not found
+    """
+    ent_ref = substr.strip()
+    if ent_ref in ent_type_cache:
+        return ent_type_cache[ent_ref]
+
+    er = get_entity('entity_ref')
+    sel_res = er.select({'entity_ref': ent_ref}, {'entity_strength': -1})
+    if sel_res.rowcount > 0:
+        er_row = sel_res.fetchone()
+        ent_type = er_row.entity_type
+    else:
+        ent_type = None
+    ent_type_cache[ent_ref] = ent_type
+    return ent_type
+
+def prefetch_entity_types(substrs):
+    """Look up (in a single query) all items not already in ent_type_cache, so that
+    subsequent get_entity_type() calls are served from the cache
+
+    :param substrs: iterable of items to lookup [string]
+    :return: void
+    """
+    ent_refs = {substr.strip() for substr in substrs} - ent_type_cache.keys()
+    ent_refs.discard('')
+    if not ent_refs:
+        return
+
+    er = get_entity('entity_ref')
+    sel_res = er.select({'entity_ref': list(ent_refs)}, {'entity_strength': -1})
+    for er_row in sel_res:
+        # rows are ordered by strength, so the first one for each ref wins (same as for
+        # get_entity_type())
+        if er_row.entity_ref in ent_refs:
+            ent_type_cache[er_row.entity_ref] = er_row.entity_type
+            ent_refs.remove(er_row.entity_ref)
+    for ent_ref in ent_refs:
+        ent_type_cache[ent_ref] = None
+
+# parse results by (ent_str, flags), since the same entity strings recur heavily across
+# plays; both caches are bounded at PARSE_CACHE_SIZE entries, evicting the least recently
+# used; examine_cache also depends on entity_ref contents, so is cleared whenever entries
+# are removed from ent_type_cache (parse_cache does not touch the database)
+PARSE_CACHE_SIZE = 50000
+examine_cache = LRUCache(PARSE_CACHE_SIZE)  # {(ent_str, flags): (ent_ptrn1, ent_ptrn2, ent_ptrn3)}
+parse_cache   = LRUCache(PARSE_CACHE_SIZE)  # {(ent_str, flags): (ent_str, [completion funcs])}
+
 class StringCtx(object):
     """
     """
@@ -225,19 +373,6 @@ class StringCtx(object):
               6.d.i. delimiter hierarchy/significance
               6.d.ii logical field groupings
         """
-        def get_entity_type(substr):
-            """
-            :param substr: item to lookup [string]
-            :return: type [string]
-            """
-            er = get_entity('entity_ref')
-            sel_res = er.select({'entity_ref': substr.strip()}, {'entity_strength': -1})
-            if sel_res.rowcount > 0:
-                er_row = sel_res.fetchone()
-                return er_row.entity_type
-            else:
-                return None
-
         def examine_entity_fld(fid_str):
             """Examine a "field", which is what is between major delimiters; note that
             fields may contain one or more commas (typically not more than 2)
@@ -247,39 +382,46 @@ class StringCtx(object):
             """
             pass
 
+        cache_key = (ent_str, flags)
+        ent_ptrns = examine_cache.get(cache_key)
+        if ent_ptrns:
+            return ent_ptrns
+
         orig_str = ent_str
         log.debug("Examining entity string: \"%s\", flags: 0x%x" % (ent_str, flags))
 
         # Pre-Proc 1. charset/unicode and whitespace fixups
-        repl8_count    = ent_str.count(REPL_CHAR_8)
-        repl16_count   = ent_str.count(REPL_CHAR_16)
-        dup_whitespace = bool(re.search(r'\s{2}', ent_str))
-        trail_astrisks = bool(re.search(r'\*$', ent_str))
-        if ent_str.count(REPL_CHAR_8):
-            log.debug("  Fix utf-8 replacement char for \"%s\"" % (ent_str))
-            ent_str = ent_str.replace(REPL_CHAR_8, REPL_CHAR_16)
-        if re.search(r'\s{2}', ent_str):
-            log.debug("  Collapse whitespace for \"%s\"" % (ent_str))
-        if re.search(r'\*$', ent_str):
+        ent_str, repl_fixed, ws_collapsed = charset_fixups(ent_str)
+        if repl_fixed:
+            log.debug("  Fix utf-8 replacement char for \"%s\"" % (orig_str))
+        if ws_collapsed:
+            log.debug("  Collapse whitespace for \"%s\"" % (orig_str))
+        new_str = ent_str.rstrip('*')
+        trail_astrisks = len(ent_str) - len(new_str)
+        if trail_astrisks:
             log.debug("  Remove trailing astrisk(s) for \"%s\"" % (ent_str))
-            ent_str = ent_str.rstrip('*')
+            ent_str = new_str
 
         # Pre-Proc 2. enclosing matched delimiters (quotes, parens, braces, etc.) for entire
         # entity string; ATTN: we currently only handle single character brackets!!!
         brackets = []
-        while ent_str and  ent_str[0] in BRACKETS.keys():
+        counts   = None
+        while ent_str and  ent_str[0] in BRACKETS:
+            if counts is None:
+                # only count chars once, then maintain counts as bracket chars are removed
+                counts = Counter(ent_str)
             open_char  = ent_str[0]
             cls_char   = BRACKETS[open_char]
             if open_char == cls_char:
-                count_char = ent_str.count(open_char)
+                count_char = counts[open_char]
                 count_open = count_char // 2 + count_char % 2
                 count_cls  = count_char // 2
                 is_matched = count_open == count_cls
                 is_encl    = ent_str[-1] == cls_char
             else:
                 count_char = None
-                count_open = ent_str.count(open_char)
-                count_cls  = ent_str.count(cls_char)
+                count_open = counts[open_char]
+                count_cls  = counts[cls_char]
                 is_matched = count_open == count_cls
                 is_encl    = ent_str[-1] == cls_char
 
@@ -295,10 +437,13 @@ class StringCtx(object):
                 # always remove outer bracket chars
                 log.debug("  Remove enclosing bracket chars for \"%s\"" % (ent_str))
                 ent_str = ent_str[1:-1]
+                counts[open_char] -= 1
+                counts[cls_char] -= 1
             elif count_open - count_cls == 1:
                 # strip off leading bracket char
                 log.debug("  Strip leading bracket char for \"%s\"" % (ent_str))
                 ent_str = ent_str[1:]
+                counts[open_char] -= 1
             else:
                 if not is_matched:
                     log.debug("  EES_WARN - mismatched interior bracket char(s) for \"%s\"" % (ent_str))
@@ -312,91 +457,86 @@ class StringCtx(object):
 
         # pass 1 - split using major delimiters '/', ';', ' - ', ' * ' (mandatory spaces as
         # indicated, otherwise optional space both before and after)
-        DELIMS_PTRN = r'( ?\/ ?| ?\; ?| \- | \* | \& )'
         ent_list  = []  # [(ent_fld, ent_start, delim_str, delim_end), ...]
         ent_elems = []
         unidents  = []
         ent_start = 0
-        # add extra entry to pick up trailing entity
-        delim_matches = list(re.finditer(DELIMS_PTRN, ent_str)) + [None]
-        log.debug("  Pass 1 - delim matches: %d" % (len(delim_matches)))
-        for m in delim_matches:
-            if m:
-                ent_end   = m.start()  # a.k.a. delim_start
-                delim_end = m.end()
-                delim_str = m.group()
-            else:
-                ent_end   = None  # represents end of ent_str
-                delim_end = None
-                delim_str = ''
+        for m in MAJ_DELIMS_PTRN.finditer(ent_str):
+            ent_end = m.start()  # a.k.a. delim_start
             # note, leading delimiter yields ent_end == 0 and empty ent_fld
             assert not ent_end or ent_start < ent_end
             ent_fld = ent_str[ent_start:ent_end]
             assert ent_fld == ent_fld.strip()
-            ent_list.append((ent_fld, ent_start, delim_str, delim_end))
-            log.debug("    Entity item %s" % (str(ent_list[-1])))
+            ent_list.append((ent_fld, ent_start, m.group(), m.end()))
+            ent_start = m.end()
+        # add extra entry to pick up trailing entity
+        ent_fld = ent_str[ent_start:]
+        assert ent_fld == ent_fld.strip()
+        ent_list.append((ent_fld, ent_start, '', None))
+        log.debug("  Pass 1 - delim matches: %d" % (len(ent_list)))
+
+        prefetch_entity_types(ent_item[0] for ent_item in ent_list)
+        for ent_item in ent_list:
+            ent_fld   = ent_item[0]
+            delim_str = ent_item[2]
+            log.debug("    Entity item %s" % (str(ent_item)))
             if ent_fld:
                 ent_type = get_entity_type(ent_fld)
                 if ent_type:
                     ent_elems.append("{{%s}}" % (ent_type) + delim_str)
                     log.debug("      Appending ent_elem \"%s\"" % (str(ent_elems[-1])))
                 else:
-                    unidents.append((ent_fld, ent_start, delim_str, delim_end))
+                    unidents.append(ent_item)
                     ent_elems.append(UNIDENT + delim_str)
                     log.debug("      Appending unident %s" % (str(unidents[-1])))
                     log.debug("      Appending ent_elem \"%s\"" % (str(ent_elems[-1])))
             else:
                 ent_elems.append(delim_str)
                 log.debug("      Appending ent_elem \"%s\"" % (str(ent_elems[-1])))
-            ent_start = delim_end
 
         ent_ptrn1 = ''.join(ent_elems)
         log.debug("    Entity pattern 1 \"%s\"" % (ent_ptrn1))
 
         # pass 2 - find entities among/across comma-deliminted expressions
         if ent_str.count(',') > 0:
-            DELIMS_PTRN = r'( ?, ?)'
-            ents1 = []  # [(ent_fld, ent_start, delim_str, delim_end), ...]
-            ents2 = []
-            ents3 = []
+            ent_flds    = []  # [(ent_start, ent_end, delim_str, delim_end), ...]
             ent_matches = []
-            unidents  = []
-            ent_start = 0
-            # add extra entry to pick up trailing entity
-            delim_matches = list(re.finditer(DELIMS_PTRN, ent_str)) + [None]
-            log.debug("  Pass 2 - delim matches: %d" % (len(delim_matches)))
-            for m in delim_matches:
-                if m:
-                    ent_end   = m.start()  # a.k.a. delim_start
-                    delim_end = m.end()
-                    delim_str = m.group()
-                else:
-                    ent_end   = 99999  # represents end of ent_str
-                    delim_end = 99999
-                    delim_str = ''
+            unidents    = []
+            ent_start   = 0
+            # note, fields are tracked by offsets only, candidate items are sliced out of
+            # ent_str below (rather than building up concatenated strings)
+            for m in COMMA_DELIM_PTRN.finditer(ent_str):
+                ent_end = m.start()  # a.k.a. delim_start
                 # note, leading delimiter yields ent_end == 0 and empty ent_fld
                 assert not ent_end or ent_start < ent_end
-                ent_fld = ent_str[ent_start:ent_end]
-                assert ent_fld == ent_fld.strip()
-
-                ents1.append((ent_fld, ent_start, delim_str, delim_end))
-                log.debug("    Entity item1 %s" % (str(ents1[-1])))
-                if len(ents1) > 1:
-                    ent_fld2 = ents1[-2][0] + ents1[-2][2] + ents1[-1][0]
-                    ents2.append((ent_fld2, ents1[-2][1], delim_str, delim_end))
-                    log.debug("    Entity item2 %s" % (str(ents2[-1])))
-                    if len(ents1) > 2:
-                        ent_fld3 = ents1[-3][0] + ents1[-3][2] + ents2[-1][0]
-                        ents3.append((ent_fld3, ents1[-3][1], delim_str, delim_end))
-                        log.debug("    Entity item3 %s" % (str(ents3[-1])))
-                ent_start = delim_end
+                assert ent_str[ent_start:ent_end] == ent_str[ent_start:ent_end].strip()
+                ent_flds.append((ent_start, ent_end, m.group(), m.end()))
+                ent_start = m.end()
+            # add extra entry to pick up trailing entity; note, this ends at a sentinel past
+            # the end of ent_str, so that the last field is never zero-length (e.g. for a
+            # trailing delimiter), and thus always overlaps the windows that include it
+            assert ent_str[ent_start:] == ent_str[ent_start:].strip()
+            str_end = len(ent_str) + 1  # represents end of ent_str
+            ent_flds.append((ent_start, str_end, '', str_end))
+            log.debug("  Pass 2 - delim matches: %d" % (len(ent_flds)))
+
+            # build list of candidate items spanning 3, 2, and 1 field(s) (in that order
+            # of preference), and look them all up in one shot
+            ent_cands = []  # [(width, ent_item), ...]
+            cands_append = ent_cands.append
+            for width in (3, 2, 1):
+                for i in range(width - 1, len(ent_flds)):
+                    ent_start = ent_flds[i - width + 1][0]
+                    ent_end, delim_str, delim_end = ent_flds[i][1:]
+                    ent_fld   = ent_str[ent_start:ent_end]
+                    cands_append((width, (ent_fld, ent_start, delim_str, delim_end)))
+            prefetch_entity_types(ent_item[0] for width, ent_item in ent_cands)
 
             # build list of matches
-            for ent_item in ents3 + ents2 + ents1:
+            for width, ent_item in ent_cands:
                 ent_fld   = ent_item[0]
-                ent_start = ent_item[1]
                 delim_str = ent_item[2]
-                delim_end = ent_item[3]
+                log.debug("    Entity item%d %s" % (width, str(ent_item)))
                 if ent_fld:
                     ent_type = get_entity_type(ent_fld)
                     if ent_type:
@@ -409,19 +549,24 @@ class StringCtx(object):
                     ent_matches.append((ent_item, delim_str))
                     log.debug("    Entity match %s" % (str(ent_matches[-1])))
 
-            # one more pass to find best [sic] fit (just do brainless N x M iteration for now)
-            ptrn_elems = []  # [(ent_item, ent_substr), ...]
+            # one more pass to find best [sic] fit--candidates are taken in order of
+            # preference; accepted elems don't overlap, and are kept sorted by position
+            # (so their ends are sorted as well), thus only the nearest preceding elem
+            # needs to be checked for conflict
+            ptrn_elems  = []  # [(ent_item, ent_substr), ...]
+            elem_starts = []
+            elem_ends   = []
             for ent_item, ent_substr in ent_matches + unidents:
-                conflict = False
-                for ptrn_item, ptrn_substr in ptrn_elems:
-                    if not (ent_item[3] <= ptrn_item[1] or ent_item[1] >= ptrn_item[3]):
-                        conflict = True
-                        break
-                if not conflict:
-                    ptrn_elems.append((ent_item, ent_substr))
-                    log.debug("    Pattern elem %s" % (str(ptrn_elems[-1])))
-            # sort by position, validate no gaps (TODO: also validate against delim_matches!!!)
-            ptrn_elems.sort(key=lambda elem: elem[0][1])
+                item_start, item_end = ent_item[1], ent_item[3]
+                idx = bisect_left(elem_starts, item_end)
+                if idx and elem_ends[idx - 1] > item_start:
+                    continue
+                idx = bisect_left(elem_starts, item_start)
+                elem_starts.insert(idx, item_start)
+                elem_ends.insert(idx, item_end)
+                ptrn_elems.insert(idx, (ent_item, ent_substr))
+                log.debug("    Pattern elem %s" % (str(ptrn_elems[idx])))
+            # validate no gaps (TODO: also validate against delim_matches!!!)
             prev_end = 0
             for elem in ptrn_elems:
                 elem_start = elem[0][1]
@@ -435,7 +580,9 @@ class StringCtx(object):
             # TODO: look for bracketed/quoted entities within unidents; try and reconstruct
             # pattern based on associations (e.g. instrument/role -> performer)!!!
 
-        return (ent_ptrn1, ent_ptrn2, ent_ptrn3)
+        ent_ptrns = (ent_ptrn1, ent_ptrn2, ent_ptrn3)
+        examine_cache[cache_key] = ent_ptrns
+        return ent_ptrns
 
     def parse_entity_str(self, flags = 0):
         """
@@ -455,29 +602,42 @@ class StringCtx(object):
         # REVISIT: or work directly on self.ent_str???
         ent_str = self.ent_str
         flags |= self.ctx_flags
+        # note, completion funcs only capture parsed values (not self), so can be shared
+        # across contexts
+        cache_key = (ent_str, flags)
+        cached = parse_cache.get(cache_key)
+        if cached:
+            self.ent_str, completion = cached
+            self.completion.extend(completion)
+            return self.ent_str
+        ncompletion = len(self.completion)
 
         # Rule 1. charset/unicode and whitespace fixups
-        if ent_str.count(REPL_CHAR_8):
+        new_str, repl_fixed, ws_collapsed = charset_fixups(ent_str)
+        if repl_fixed:
             log.debug("PES_RULE 1a - fix utf-8 replacement char for \"%s\"" % (ent_str))
-            ent_str = ent_str.replace(REPL_CHAR_8, REPL_CHAR_16)
-        if re.search(r'\s{2}', ent_str):
+        if ws_collapsed:
             log.debug("PES_RULE 1b - collapsing whitespace for \"%s\"" % (ent_str))
-            ent_str = re.sub(r'\s{2,}', ' ', ent_str)
+        ent_str = new_str
 
         # Rule 2. enclosing matched delimiters (quotes, parens, braces, etc.), entire string
         # ("entity string"); ATTN: we currently only handle single character brackets!!!
-        while ent_str and  ent_str[0] in BRACKETS.keys():
+        counts = None
+        while ent_str and  ent_str[0] in BRACKETS:
+            if counts is None:
+                # only count chars once, then maintain counts as bracket chars are removed
+                counts = Counter(ent_str)
             open_char  = ent_str[0]
             cls_char   = BRACKETS[open_char]
             if open_char == cls_char:
-                count_char = ent_str.count(open_char)
+                count_char = counts[open_char]
                 count_open = count_char // 2 + count_char % 2
                 count_cls  = count_char // 2
                 is_matched = count_open == count_cls
                 is_encl    = ent_str[-1] == cls_char
             else:
-                count_open = ent_str.count(open_char)
-                count_cls  = ent_str.count(cls_char)
+                count_open = counts[open_char]
+                count_cls  = counts[cls_char]
                 is_matched = count_open == count_cls
                 is_encl    = ent_str[-1] == cls_char
 
@@ -485,10 +645,13 @@ class StringCtx(object):
                 # always remove outer bracket chars
                 log.debug("PES_RULE 2a - remove enclosing bracket chars for \"%s\"" % (ent_str))
                 ent_str = ent_str[1:-1]
+                counts[open_char] -= 1
+                counts[cls_char] -= 1
             elif count_open - count_cls == 1:
                 # strip off leading bracket char
                 log.debug("PES_RULE 2b - strip leading bracket char for \"%s\"" % (ent_str))
                 ent_str = ent_str[1:]
+                counts[open_char] -= 1
             else:
                 if not is_matched:
                     log.debug("PES_WARN - mismatched interior bracket char(s) for \"%s\"" % (ent_str))
@@ -523,6 +686,7 @@ class StringCtx(object):
         """
 
         self.ent_str = ent_str
+        parse_cache[cache_key] = (ent_str, self.completion[ncompletion:])
         return self.ent_str
 
     def parse_person_str(self, person_str, flags = 0):
@@ -533,7 +697,12 @@ class StringCtx(object):
 
         # step 2 - preserve suffixes introduced by commas (e.g. "Jr.", "Sr.", etc.) (factor out
         # from regular comma processing)
-        m = re.search(r'(,? (?:Jr|Sr)\.?)(?:\W|$)', person_str, flags=re.I)
+        # note: cheap prefilter for the (case-insensitive) suffix pattern, which requires
+        # a space before "Jr"/"Sr"; casefold() tracks the regex case-insensitive matching
+        fold_str = person_str.casefold()
+        m = None
+        if ' jr' in fold_str or ' sr' in fold_str:
+            m = PERS_SUFFIX_PTRN.search(person_str)
         if m:
             suffix = m.group(1)
             log.debug("PPS_RULE 6 - preserve suffix \"%s\" for \"%s\"" % (suffix, person_str))
@@ -549,10 +718,10 @@ class StringCtx(object):
 
         # step 3 - fix "Last, First" (handle "Last, First Middle ..."); note, we are also
         # coelescing spaces (might as well)
-        m = re.fullmatch(r'([\w\ufffd<>-]+),((?:\s+[\w\ufffd-]+)+)', person_str)
+        m = LAST_FIRST_PTRN.fullmatch(person_str)
         if m:
             log.debug("PPS_RULE 4 - reverse \"Last, First [...]\" for \"%s\"" % (person_str))
-            person_str = "%s %s" % (re.sub(r'\s{2,}', ' ', m.group(2).lstrip()), m.group(1))
+            person_str = "%s %s" % (DUP_WS_PTRN.sub(' ', m.group(2).lstrip()), m.group(1))
 
         # step 4 - handle non-comma-introduced suffixes (e.g. "II") and compound last names (e.g.
         # Vaughan Williams)
@@ -563,7 +732,7 @@ class StringCtx(object):
 
         # step 7 - remove conductor role suffix ("cond.", "conductor", etc.)
         if flags & ParseFlag.CONDUCTOR:
-            m = re.fullmatch(r'(.+), ([\w\./ ]+)', person_str)
+            m = COND_ROLE_PTRN.fullmatch(person_str)
             if m:
                 if m.group(2).lower() in COND_STRS:
                     log.debug("PPS_RULE 5 - removing role suffix \"%s\" for \"%s\"" %
@@ -579,13 +748,13 @@ class StringCtx(object):
         flags |= self.ctx_flags
 
         # step 3 - convert single-quoted titles to double-quoted
-        # note, we are currently biased toward better-formed quotes toward end of title
+        # note, we are currently biased toward better-formed quotes toward end of title (i.e.
+        # quotes are paired up from the end, thus the substitution on the reversed string)
         # LATER: try with different biases, and determine best-formed result!!!)
-        m = re.fullmatch(r'(.*)\'([^\']*)\'([^\']*)', title_str)
-        while m:
+        rev_str, nquotes = SQ_PAIR_PTRN.subn(r'"\1"', title_str[::-1])
+        if nquotes:
             log.debug("PTS_RULE 3 - convert single-quoted titles to double quotes \"%s\"" % (title_str))
-            title_str = "%s\"%s\"%s" % (m.group(1), m.group(2), m.group(3))
-            m = re.fullmatch(r'(.*)\'([^\']*)\'([^\']*)', title_str)
+            title_str = rev_str[::-1]
 
         return title_str
 
@@ -605,7 +774,7 @@ class StringCtx(object):
         if not name:
             log.outlier("Empty composer name \"%s\", parsed from \"%s\"" %
                         (name, orig_str))
-        elif not re.match(r'\w', name):
+        elif not WORD_CHAR_PTRN.match(name):
             log.outlier("Bad leading character in composer \"%s\", parsed from \"%s\"" %
                         (name, orig_str))
         return {'name': name, 'raw_name': orig_str if name != orig_str else None, 'is_composer': True}
@@ -616,7 +785,7 @@ class StringCtx(object):
         if not name:
             log.outlier("Empty work name \"%s\", parsed from \"%s\"" %
                         (name, orig_str))
-        elif not re.match(r'\w', name):
+        elif not WORD_CHAR_PTRN.match(name):
             log.outlier("Bad leading character in work \"%s\", parsed from \"%s\"" %
                         (name, orig_str))
         return {'name': name, 'raw_name': orig_str if name != orig_str else None}
@@ -627,7 +796,7 @@ class StringCtx(object):
         if not name:
             log.outlier("Empty conductor name \"%s\", parsed from \"%s\"" %
                         (name, orig_str))
-        elif not re.match(r'\w', name):
+        elif not WORD_CHAR_PTRN.match(name):
             log.outlier("Bad leading character in conductor \"%s\", parsed from \"%s\"" %
                         (name, orig_str))
         return {'name': name, 'raw_name': orig_str if name != orig_str else None, 'is_conductor': True}
@@ -640,7 +809,7 @@ class StringCtx(object):
         if not name:
             log.outlier("Empty performer name \"%s\" [%s], parsed from \"%s\"" %
                         (name, role, orig_str))
-        elif not re.match(r'\w', name):
+        elif not WORD_CHAR_PTRN.match(name):
             log.outlier("Bad leading character in performer \"%s\" [%s], parsed from \"%s\"" %
                         (name, role, orig_str))
         perf_person = {'name': name, 'raw_name': orig_str if name != orig_str else None}
@@ -654,7 +823,7 @@ class StringCtx(object):
         if not name:
             log.outlier("Empty ensemble name \"%s\", parsed from \"%s\"" %
                         (name, orig_str))
-        elif not re.match(r'\w', name):
+        elif not WORD_CHAR_PTRN.match(name):
             log.outlier("Bad leading character in ensemble \"%s\", parsed from \"%s\"" %
                         (name, orig_str))
         return {'name': name, 'raw_name': orig_str if name != orig_str else None}
@@ -665,12 +834,40 @@ class StringCtx(object):
 
 NormFlag = LOV({'INCL_SELF' : 0x0001})
 
-HONORIFICS = {'Frei', 'Sir', 'Count', 'Comtessa', 'Compte',
-              'Sister', 'Dame', 'Capt.', 'Cpl.', 'Rev.', 'Dr.'}
-SUFFIXES   = {'Jr.', 'Sr.', 'Jr', 'Sr', 'II', 'III', 'IV'}
-CODEX_LIST = {'Codex','Tablature', 'Manuscript', 'Book', 'Breviary',
-              'Hymnorum', 'Cordiforme', 'Nonnberg', 'Ottelio'}
-ANONYMOUS  = {'Anonymous', 'Unknown'}
+HONORIFICS = frozenset({'Frei', 'Sir', 'Count', 'Comtessa', 'Compte',
+                        'Sister', 'Dame', 'Capt.', 'Cpl.', 'Rev.', 'Dr.'})
+SUFFIXES   = frozenset({'Jr.', 'Sr.', 'Jr', 'Sr', 'II', 'III', 'IV'})
+CODEX_LIST = frozenset({'Codex','Tablature', 'Manuscript', 'Book', 'Breviary',
+                        'Hymnorum', 'Cordiforme', 'Nonnberg', 'Ottelio'})
+ANONYMOUS  = frozenset({'Anonymous', 'Unknown'})
+
+# trailing suffix (e.g. "First Last Jr."); note, this pattern is overly-generic for the
+# separator (given parsing in normalize_name()), but leave this way, since it conveys the
+# larger intent
+SUFFIX_PTRN = re.compile(r'(.+)(,? )(%s)' % ('|'.join(sorted(re.escape(s) for s in SUFFIXES))))
+
+# collapse whitespace, collapse commas and ensure that commas are followed by a space--all
+# in a single pass (see name_fixup(), below)
+NAME_FIXUP_PTRN = re.compile(r'(\s{2,})|,+(?=(\S?))')
+
+# nicknames, either quoted or paren'ed (note, branch reset so that the opening delimiter
+# and nickname are groups 2 and 3 in either case), and non-standard chars, for normalized
+# names
+NICK_PTRN       = re.compile(r'(%s) (?|(\")(%s)\"|(\()(%s)\)) (%s)' %
+                             (NAME_RE, NAME_RE, NAME_RE, NAME_RE))
+NAME_EXCL_PTRN  = re.compile(NAME_EXCL)
+# leading honorific (note, honorifics do not contain spaces), for str.startswith()
+HONOR_PREFIXES  = tuple(h + ' ' for h in sorted(HONORIFICS))
+
+def name_fixup(m):
+    """Replacement function for NAME_FIXUP_PTRN
+
+    :param m: match object
+    :return: replacement string
+    """
+    if m.group(1):
+        return ' '
+    return ', ' if m.group(2) else ','
 
 def normalize_name(name, flags = 0):
     """Normalize a western-style name
@@ -692,12 +889,7 @@ def normalize_name(name, flags = 0):
     anon       = None
 
     # collapse/fix whitespace and punctuation, if needed
-    if re.search(r'\s{2}', name):
-        name = re.sub(r'\s{2,}', ' ', name)
-    if re.search(r',{2}', name):
-        name = re.sub(r',{2,}', ',', name)
-    if re.search(r',\S', name):
-        name = re.sub(r',(\S)', r', \1', name)
+    name = NAME_FIXUP_PTRN.sub(name_fixup, name)
     name = name.strip(' ,;')
 
     parts = name.split(', ')
@@ -741,10 +933,7 @@ def normalize_name(name, flags = 0):
             suffix = parts.pop(-1)
             suffix_sep = ', '
         else:
-            # note, this pattern is overly-generic for the separator (given parsing above),
-            # but leave this way, since it conveys the larger intent
-            pattern = r'(.+)(,? )(%s)' % ('|'.join({s.replace('.', r'\.') for s in SUFFIXES}))
-            m = re.fullmatch(pattern, parts[-1])
+            m = SUFFIX_PTRN.fullmatch(parts[-1])
             if m:
                 parts[-1]  = m.group(1)
                 suffix_sep = m.group(2)
@@ -777,10 +966,8 @@ def normalize_name(name, flags = 0):
         parts.insert(0, anon + ',')
     normalized = ' '.join(parts)
 
-    # build aliases for nicknames (capture delimiter to distinguish matching pattern)
-    pattern1 = r'(%s) (\")(%s)\" (%s)' % (NAME_RE, NAME_RE, NAME_RE)
-    pattern2 = r'(%s) (\()(%s)\) (%s)' % (NAME_RE, NAME_RE, NAME_RE)
-    m = re.fullmatch(pattern1, normalized) or re.fullmatch(pattern2, normalized)
+    # build aliases for nicknames
+    m = NICK_PTRN.fullmatch(normalized)
     if m:
         aliases.add("%s %s" % (m.group(1), m.group(4)))
         aliases.add("%s %s" % (m.group(3), m.group(4)))
@@ -788,19 +975,18 @@ def normalize_name(name, flags = 0):
         aliases.add("\"%s\" %s" % (m.group(3), m.group(4)))
         if m.group(2) == '(':
             aliases.add("%s \"%s\" %s" % (m.group(1), m.group(3), m.group(4)))
-    elif re.search(NAME_EXCL, normalized):
+    elif NAME_EXCL_PTRN.search(normalized):
         log.outlier("Non-standard char(s) in normalized name \"%s\" (raw: \"%s\")" %
                     (normalized, name))
 
-    if not honor:
-        pattern = r"(%s) (.+)" % ('|'.join(HONORIFICS))
-        m = re.fullmatch(pattern, normalized)
-        if m:
-            honor = m.group(1)
-            aliases.add(m.group(2))
-    while len(parts) > 2:
-        parts.pop(0)
-        aliases.add(' '.join(parts))
+    if not honor and normalized.startswith(HONOR_PREFIXES):
+        prefix, rest = normalized.split(' ', 1)
+        if rest:
+            honor = prefix
+            aliases.add(rest)
+    # add trailing (2 or more) parts as aliases
+    for i in range(1, len(parts) - 1):
+        aliases.add(' '.join(parts[i:]))
     # REVISIT: not sure we really want to do this (especially if/when we know it comes in
     # malfored)--perhaps better left to caller's discretion (modulo slight fixup, above)!!!
     if normalized != name and flags & NormFlag.INCL_SELF:
@@ -819,40 +1005,84 @@ class MusicEnt(object):
         """
         self.name     = entity
         self.tab      = db.get_table(self.name)
-        self.cols     = {c.name for c in self.tab.columns}
+        self.cols     = frozenset(c.name for c in self.tab.columns)
         self.last_sel = None
         self.last_ins = None
         self.last_upd = None
         self.last_del = None
+        # statements are built once per distinct "shape" (i.e. criteria/key columns, and
+        # order by), using bind params for values, and their compiled forms are cached by
+        # SQLAlchemy (see DatabaseCtx.compiled_cache)
+        # inserts return the inserted row(s) (see inserted_row() and insert_many())
+        self.ins_ret        = self.tab.insert().returning(*self.tab.columns)
+        self.sel_cache      = {}
+        self.upd_cache      = {}
+        self.ins_many_cache = {}
+
+    def clear_cache(self):
+        """Clear cached statements (e.g. after schema changes)
+
+        :return: void
+        """
+        self.sel_cache.clear()
+        self.upd_cache.clear()
+        self.ins_many_cache.clear()
+        # note, this is shared by all entities (which just have to recompile)
+        db.compiled_cache.clear()
 
     def select(self, crit, order_by = None):
         """
-        :param crit: dict of query criteria
+        :param crit: dict of query criteria (collection values are matched using IN)
         :param order_by: list of column names, or dict of names mapped to +/-1 (asc/desc)
         :return: SQLAlchemy ResultProxy
         """
         if not crit:
             raise RuntimeError("Query criteria must be specified")
-        unknown = set(crit) - self.cols
-        if unknown:
+        # note, only build the set of unknown columns if validation fails
+        if not self.cols.issuperset(crit):
+            unknown = set(crit) - self.cols
             raise RuntimeError("Unknown column(s) for \"%s\": %s" % (self.name, str(unknown)))
 
-        sel = self.tab.select()
+        # statement shape is determined by the crit columns (and whether each value is a
+        # list, None, or scalar) and order by
+        params = {}
+        crit_key = []
         for col, val in crit.items():
-            # NOTE: there was previously a problem (exception) with a timedelta (Interval) field in
-            # the query crit, not sure why--we don't currently need to special-case remove that from
-            # crit any more, but the error may come up again in the future, so may need investigate
-            # again if/when it does
-            sel = sel.where(self.tab.c[col] == val)
+            if collecttype(val):
+                params[col] = list(val)
+                crit_key.append((col, 'in'))
+            elif val is None:
+                crit_key.append((col, 'null'))
+            else:
+                params[col] = val
+                crit_key.append((col, 'eq'))
         if order_by:
             if strtype(order_by):
                 order_by = {order_by: 1}
             elif collecttype(order_by):
                 order_by = {c: 1 for c in order_by}
-            for col, dir in order_by.items():
+            order_by = tuple(order_by.items())
+        sel_key = (tuple(sorted(crit_key)), order_by)
+
+        sel = self.sel_cache.get(sel_key)
+        if sel is None:
+            sel = self.tab.select()
+            for col, op in sel_key[0]:
+                # NOTE: there was previously a problem (exception) with a timedelta (Interval) field in
+                # the query crit, not sure why--we don't currently need to special-case remove that from
+                # crit any more, but the error may come up again in the future, so may need investigate
+                # again if/when it does
+                if op == 'in':
+                    sel = sel.where(self.tab.c[col].in_(bindparam(col, expanding=True)))
+                elif op == 'null':
+                    sel = sel.where(self.tab.c[col] == None)
+                else:
+                    sel = sel.where(self.tab.c[col] == bindparam(col))
+            for col, dir in order_by or ():
                 sel = sel.order_by(self.tab.c[col] if dir >= 0 else self.tab.c[col].desc())
+            self.sel_cache[sel_key] = sel
         with db.conn.begin() as trans:
-            res = db.conn.execute(sel)
+            res = db.conn.execute(sel, params)
         self.last_sel = sel
         return res
 
@@ -863,18 +1093,64 @@ class MusicEnt(object):
         """
         if not data:
             raise RuntimeError("Insert data must be specified")
-        unknown = set(data) - self.cols
-        if unknown:
+        # note, only build the set of unknown columns if validation fails
+        if not self.cols.issuperset(data):
+            unknown = set(data) - self.cols
             raise RuntimeError("Unknown column(s) for \"%s\": %s" % (self.name, str(unknown)))
 
         with warnings.catch_warnings():
             warnings.filterwarnings('ignore', message=PK_WARNING)
-            ins = self.tab.insert()
-            with db.conn.begin() as trans:
-                res = db.conn.execute(ins, data)
+            with self.begin_insert() as trans:
+                res = db.conn.execute(self.ins_ret, data)
+        self.last_ins = self.ins_ret
+        return res
+
+    def insert_many(self, data_list):
+        """Insert multiple rows in a single (multi-VALUES) statement, returning the inserted
+        rows; note that this is all-or-nothing (e.g. if any row violates a constraint)
+
+        :param data_list: list of dicts of data to insert (all with the same keys)
+        :return: SQLAlchemy ResultProxy (with the inserted rows)
+        """
+        if not data_list:
+            raise RuntimeError("Insert data must be specified")
+        keys = tuple(sorted(data_list[0]))
+        for data in data_list:
+            if not self.cols.issuperset(data):
+                unknown = set(data) - self.cols
+                raise RuntimeError("Unknown column(s) for \"%s\": %s" % (self.name, str(unknown)))
+            if len(data) != len(keys) or not all(col in data for col in keys):
+                raise RuntimeError("Insert data for \"%s\" must all have the same keys" % (self.name))
+
+        # statement shape is determined by the columns and number of rows (values for each
+        # row are bound by position, e.g. "hash_level_0", "hash_level_1", etc.)
+        ins_key = (keys, len(data_list))
+        ins = self.ins_many_cache.get(ins_key)
+        if ins is None:
+            values = [{col: bindparam('%s_%d' % (col, i)) for col in keys}
+                      for i in range(len(data_list))]
+            ins = self.tab.insert().values(values).returning(*self.tab.columns)
+            self.ins_many_cache[ins_key] = ins
+        params = {'%s_%d' % (col, i): data[col] for i, data in enumerate(data_list) for col in keys}
+
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message=PK_WARNING)
+            with self.begin_insert() as trans:
+                res = db.conn.execute(ins, params)
         self.last_ins = ins
         return res
 
+    def begin_insert(self):
+        """Begin transaction for insert--if called within an outer transaction, use a
+        savepoint so that the caller can recover from a failed insert (e.g. IntegrityError
+        for duplicates)
+
+        :return: SQLAlchemy Transaction
+        """
+        if db.conn.in_transaction():
+            return db.conn.begin_nested()
+        return db.conn.begin()
+
     def update(self, row, data):
         """
         :param row: SQLAlchemy RowProxy from select statement
@@ -883,25 +1159,74 @@ class MusicEnt(object):
         """
         if not data:
             raise RuntimeError("Update data must be specified")
-        unknown = set(data) - self.cols
-        if unknown:
+        # note, only build the set of unknown columns if validation fails
+        if not self.cols.issuperset(data):
+            unknown = set(data) - self.cols
             raise RuntimeError("Unknown column(s) for \"%s\": %s" % (self.name, str(unknown)))
 
-        upd = self.tab.update()
+        # note, key bind params are prefixed, to keep them distinct from the update data
+        params = data.copy()
+        key_cols = []
         for col, val in key_data(row, self.name).items():
-            upd = upd.where(self.tab.c[col] == val)
+            if val is None:
+                key_cols.append((col, 'null'))
+            else:
+                params['key_' + col] = val
+                key_cols.append((col, 'eq'))
+        upd_key = tuple(sorted(key_cols))
+
+        upd = self.upd_cache.get(upd_key)
+        if upd is None:
+            upd = self.tab.update()
+            for col, op in upd_key:
+                if op == 'null':
+                    upd = upd.where(self.tab.c[col] == None)
+                else:
+                    upd = upd.where(self.tab.c[col] == bindparam('key_' + col))
+            self.upd_cache[upd_key] = upd
         with db.conn.begin() as trans:
-            res = db.conn.execute(upd, data)
+            res = db.conn.execute(upd, params)
         # TODO: update row._row with updated data values!!!
         self.last_upd = upd
         return res
 
+    def select_map(self, crit, key_cols):
+        """Select rows (typically for a list of values, see select()), mapped by key; note
+        that None in a list of values is looked up separately (IS NULL), since NULL never
+        matches IN (...)
+
+        :param crit: dict of query criteria
+        :param key_cols: list of column names to use as mapping key
+        :return: dict of tuple(key values) -> SQLAlchemy RowProxy
+        """
+        null_cols = [col for col, val in crit.items() if collecttype(val) and None in val]
+        if len(null_cols) > 1:
+            raise RuntimeError("None values not supported for multiple IN columns: %s" % (str(null_cols)))
+        crits = [crit]
+        if null_cols:
+            null_col = null_cols[0]
+            vals = [val for val in crit[null_col] if val is not None]
+            crits = [dict(crit, **{null_col: None})]
+            if vals:
+                crits.append(dict(crit, **{null_col: vals}))
+
+        rows = {}
+        for sel_crit in crits:
+            for row in self.select(sel_crit):
+                rows[tuple(row[col] for col in key_cols)] = row
+        return rows
+
     def inserted_row(self, res, ent_override = None):
         """
         :param res: SQLAlchemy ResultProxy from insert statement
-        :param ent_override: e.g. used if _alt entity
+        :param ent_override: e.g. used if _alt entity (only needed if requerying)
         :return: SQLAlchemy RowProxy if exactly one row returned, otherwise None
         """
+        # insert() uses RETURNING, so the row is available from the result itself (no
+        # need to requery)
+        if res.returns_rows:
+            return res.fetchone()
+
         params = res.last_inserted_params()
 
         if ent_override:
@@ -913,7 +1238,7 @@ class MusicEnt(object):
 
     def inserted_primary_key(self, res, ent_override = None):
         """res.inserted_primary_key is not currently working (probably due to the use_identity()
-        hack), so need to requery new row to get the primary key
+        hack), so get the primary key from the inserted row
 
         :param res: SQLAlchemy ResultProxy from insert statement
         :param ent_override: e.g. used if _alt entity
@@ -932,24 +1257,61 @@ class MusicLib(object):
     def __init__(self):
         """
         """
-        pass
+        # station and program records by key fields (these do not change, and are needed
+        # for every program_play and/or play); note, only rows found by select are cached,
+        # since newly inserted rows go away if the enclosing transaction rolls back
+        self.sta_cache  = {}
+        self.prog_cache = {}
+        # entity_string unique keys (entity_str, source_fld, station_id) already inserted
+        # or found to exist, since the same strings recur across plays within a playlist
+        self.es_keys    = set()
+
+    def clear_cache(self):
+        """Clear cached station/program rows (e.g. after a rollback)
 
-    def insert_program_play(self, playlist, data):
+        :return: void
         """
-        :param playlist: parent Playlist object
-        :param data: normalized playlist key/value data (dict)
-        :return: key-value dict comprehension for inserted program_play fields
+        self.sta_cache.clear()
+        self.prog_cache.clear()
+
+    @contextmanager
+    def begin(self):
+        """Outer transaction for insert_program_play() and insert_play() (MusicEnt
+        operations within it only open subtransactions or savepoints); if it rolls back,
+        rows cached during it may no longer exist, so cached rows are cleared (they are
+        reselected as needed)
+
+        :return: SQLAlchemy Transaction
+        """
+        try:
+            with db.conn.begin() as trans:
+                yield trans
+        except:
+            self.clear_cache()
+            raise
+
+    def get_station_row(self, station):
+        """Get (or create) station record, cached for subsequent calls
+
+        :param station: Station object
+        :return: SQLAlchemy RowProxy for station
         """
-        station = playlist.station
         # TODO: get rid of this hardwired structure (implicitly use fields from config file)!!!
         sta_data = {'name'      : station.name,
                     'timezone'  : station.timezone,
                     'synd_level': station.synd_level}
+        sta_key = key_data(sta_data, 'station')
+        cache_key = tuple(sorted(sta_key.items()))
+        if cache_key in self.sta_cache:
+            return self.sta_cache[cache_key]
+
         sta = get_entity('station')
-        sel_res = sta.select(key_data(sta_data, 'station'))
+        sel_res = sta.select(sta_key)
         if sel_res.rowcount == 1:
             sta_row = sel_res.fetchone()
+            self.sta_cache[cache_key] = sta_row
         else:
+            # note, inserted row is not cached (see __init__()), it will be on the next call
             log.trace("Inserting station \"%s\" into musiclib" % (station.name))
             ins_res = sta.insert(sta_data)
             if ins_res.rowcount == 0:
@@ -957,320 +1319,357 @@ class MusicLib(object):
             sta_row = sta.inserted_row(ins_res)
             if not sta_row:
                 raise RuntimeError("Station %s not in musiclib" % (station.name))
+        return sta_row
 
-        prog_data = data['program']
-        prog = get_entity('program')
-        sel_res = prog.select(key_data(prog_data, 'program'))
-        if sel_res.rowcount == 1:
-            prog_row = sel_res.fetchone()
-        else:
-            prog_name = prog_data['name']  # for convenience
-            prog_label = "\"%s\"" % (prog_name)
-            log.trace("Inserting program %s into musiclib" % (prog_label))
-            ins_res = prog.insert(prog_data)
-            if ins_res.rowcount == 0:
-                raise RuntimeError("Could not insert program %s into musiclib" % (prog_label))
-            prog_row = prog.inserted_row(ins_res)
+    def insert_program_play(self, playlist, data):
+        """
+        :param playlist: parent Playlist object
+        :param data: normalized playlist key/value data (dict)
+        :return: key-value dict for inserted program_play fields
+        """
+        # note, all operations are done in a single transaction (see begin())
+        with self.begin() as trans:
+            sta_row = self.get_station_row(playlist.station)
+
+            prog_data = data['program']
+            prog_key = key_data(prog_data, 'program')
+            cache_key = tuple(sorted(prog_key.items()))
+            prog_row = self.prog_cache.get(cache_key)
             if not prog_row:
-                raise RuntimeError("Program %s not in musiclib" % (prog_label))
-
-        pp_row = None
-        pp_data = data['program_play']
-        pp_data['station_id'] = sta_row.id
-        pp_data['program_id'] = prog_row.id
-        prog_play = get_entity('program_play')
-        try:
-            ins_res = prog_play.insert(pp_data)
-            pp_row = prog_play.inserted_row(ins_res)
-            log.trace("Created program_play ID %d (%s, \"%s\", %s %s)" %
-                      (pp_row.id, sta_row.name, prog_row.name,
-                       pp_row.prog_play_date, pp_row.prog_play_start))
-        except IntegrityError:
-            # TODO: need to indicate duplicate to caller (currenty looks like an insert)!!!
-            sel_res = prog_play.select(key_data(pp_data, 'program_play'))
-            if sel_res.rowcount == 1:
-                pp_row = sel_res.fetchone()
-                log.debug("Skipping insert of duplicate program_play record (ID %d)" % (pp_row.id))
-            else:
-                pass  # REVISIT: is this an internal error???
-        return {k: v for k, v in pp_row.items()} if pp_row else None
+                prog = get_entity('program')
+                sel_res = prog.select(prog_key)
+                if sel_res.rowcount == 1:
+                    prog_row = sel_res.fetchone()
+                    self.prog_cache[cache_key] = prog_row
+                else:
+                    # note, inserted row is not cached (see get_station_row())
+                    prog_name = prog_data['name']  # for convenience
+                    prog_label = "\"%s\"" % (prog_name)
+                    log.trace("Inserting program %s into musiclib" % (prog_label))
+                    ins_res = prog.insert(prog_data)
+                    if ins_res.rowcount == 0:
+                        raise RuntimeError("Could not insert program %s into musiclib" % (prog_label))
+                    prog_row = prog.inserted_row(ins_res)
+                    if not prog_row:
+                        raise RuntimeError("Program %s not in musiclib" % (prog_label))
+
+            pp_row = None
+            pp_data = data['program_play']
+            pp_data['station_id'] = sta_row.id
+            pp_data['program_id'] = prog_row.id
+            prog_play = get_entity('program_play')
+            try:
+                ins_res = prog_play.insert(pp_data)
+                pp_row = prog_play.inserted_row(ins_res)
+                log.trace("Created program_play ID %d (%s, \"%s\", %s %s)" %
+                          (pp_row.id, sta_row.name, prog_row.name,
+                           pp_row.prog_play_date, pp_row.prog_play_start))
+            except IntegrityError:
+                # TODO: need to indicate duplicate to caller (currenty looks like an insert)!!!
+                sel_res = prog_play.select(key_data(pp_data, 'program_play'))
+                if sel_res.rowcount == 1:
+                    pp_row = sel_res.fetchone()
+                    log.debug("Skipping insert of duplicate program_play record (ID %d)" % (pp_row.id))
+                else:
+                    pass  # REVISIT: is this an internal error???
+            return dict(pp_row) if pp_row else None
 
     def insert_play(self, playlist, prog_play, data):
         """
         :param playlist: parent Playlist object
         :param prog_play: parent program_play fields (dict)
         :param data: normalized play key/value data (dict)
-        :return: key-value dict comprehension for inserted play fields
+        :return: key-value dict for inserted play fields
         """
-        station = playlist.station
-        # TODO: see above, insert_program_play()!!!  In addition, note that we should
-        # really not have to requery here--the right thing to do is cache the station
-        # record (in fact, we really only need the id here)!!!
-        sta_data = {'name'      : station.name,
-                    'timezone'  : station.timezone,
-                    'synd_level': station.synd_level}
-        sta = get_entity('station')
-        sel_res = sta.select(key_data(sta_data, 'station'))
-        if sel_res.rowcount == 1:
-            sta_row = sel_res.fetchone()
-        else:
-            # NOTE: should really never get here (select should not fail), since this
-            # same code was executed when inserting the program_play
-            log.trace("Inserting station \"%s\" into musiclib" % (station.name))
-            ins_res = sta.insert(sta_data)
-            if ins_res.rowcount == 0:
-                raise RuntimeError("Could not insert station \"%s\" into musiclib" % (station.name))
-            sta_row = sta.inserted_row(ins_res)
-            if not sta_row:
-                raise RuntimeError("Station %s not in musiclib" % (station.name))
-
-        comp_data = data['composer']
-        # NOTE: we always make sure there is a composer record (even if NONE or UNKNOWN), since work depends
-        # on it (and there is no play without work, haha)
-        if not comp_data.get('name'):
-            comp_data['name'] = NameVal.NONE
-        comp = get_entity('person')
-        sel_res = comp.select(key_data(comp_data, 'person'))
-        if sel_res.rowcount == 1:
-            comp_row = sel_res.fetchone()
-            if not comp_row.is_composer:
-                comp.update(comp_row, {'is_composer': True})
-        else:
-            comp_name = comp_data['name']  # for convenience
-            log.trace("Inserting composer \"%s\" into musiclib" % (comp_name))
-            ins_res = comp.insert(comp_data)
-            if ins_res.rowcount == 0:
-                raise RuntimeError("Could not insert composer/person \"%s\" into musiclib" % (comp_name))
-            comp_row = comp.inserted_row(ins_res)
-            if not comp_row:
-                raise RuntimeError("Composer/person \"%s\" not in musiclib" % (comp_name))
-
-        work_data = data['work']
-        if not work_data.get('name'):
-            # REVISIT: for how, insert '<unknown>' work, just so we have a record of this and can
-            # try and identify the scenario (note, should really be logging to exception table)!!!
-            work_data['name'] = NameVal.UNKNOWN
-            #log.debug("Work name not specified, skipping...")
-            #return None
-        work_data['composer_id'] = comp_row.id
-        work = get_entity('work')
-        sel_res = work.select(key_data(work_data, 'work'))
-        if sel_res.rowcount == 1:
-            work_row = sel_res.fetchone()
-        else:
-            work_name = work_data['name']  # for convenience
-            log.trace("Inserting work \"%s\" into musiclib" % (work_name))
-            ins_res = work.insert(work_data)
-            if ins_res.rowcount == 0:
-                raise RuntimeError("Could not insert work/person \"%s\" into musiclib" % (work_name))
-            work_row = work.inserted_row(ins_res)
-            if not work_row:
-                raise RuntimeError("Work/person \"%s\" not in musiclib" % (work_name))
-
-        cond_row = None
-        cond_data = data['conductor']
-        if cond_data.get('name'):
-            cond = get_entity('person')
-            sel_res = cond.select(key_data(cond_data, 'person'))
-            if sel_res.rowcount == 1:
-                cond_row = sel_res.fetchone()
-                if not cond_row.is_conductor:
-                    cond.update(cond_row, {'is_conductor': True})
-            else:
-                cond_name = cond_data['name']  # for convenience
-                log.trace("Inserting conductor \"%s\" into musiclib" % (cond_name))
-                ins_res = cond.insert(cond_data)
-                if ins_res.rowcount == 0:
-                    raise RuntimeError("Could not insert conductor/person \"%s\" into musiclib" % (cond_name))
-                cond_row = cond.inserted_row(ins_res)
-                if not cond_row:
-                    raise RuntimeError("Conductor/person \"%s\" not in musiclib" % (cond_name))
-
-        rec_row = None
-        rec_data = data['recording']
-        clean_user_keys(rec_data, 'recording')
-        clean_user_keys(rec_data, 'recording_alt')
-        if rec_data.get('label') and rec_data.get('catalog_no'):
-            rec = get_entity('recording')
-            sel_res = rec.select(key_data(rec_data, 'recording'))
-            if sel_res.rowcount == 1:
-                rec_row = sel_res.fetchone()
-            else:
-                rec_ident = "%s %s" % (rec_data['label'], rec_data['catalog_no'])  # for convenience
-                log.trace("Inserting recording \"%s\" into musiclib" % (rec_ident))
-                ins_res = rec.insert(rec_data)
-                if ins_res.rowcount == 0:
-                    raise RuntimeError("Could not insert recording \"%s\" into musiclib" % (rec_ident))
-                rec_row = rec.inserted_row(ins_res)
-                if not rec_row:
-                    raise RuntimeError("Recording \"%s\" not in musiclib" % (rec_ident))
-        elif rec_data.get('name'):
-            rec = get_entity('recording')
-            sel_res = rec.select(key_data(rec_data, 'recording_alt'))
-            if sel_res.rowcount == 1:
-                rec_row = sel_res.fetchone()
-            elif sel_res.rowcount > 1:
-                # REVISIT: just pick the first one randomly???
-                rec_row = sel_res.fetchone()
-            else:
-                rec_name = rec_data['name']  # for convenience
-                log.trace("Inserting recording \"%s\" into musiclib" % (rec_name))
-                ins_res = rec.insert(rec_data)
-                if ins_res.rowcount == 0:
-                    raise RuntimeError("Could not insert recording \"%s\" into musiclib" % (rec_name))
-                rec_row = rec.inserted_row(ins_res, 'recording_alt')
-                if not rec_row:
-                    raise RuntimeError("Recording \"%s\" not in musiclib" % (rec_name))
-
-        perf_rows = []
-        for perf_data in data['performers']:
-            # STEP 1 -: insert/select underlying person record
-            perf_person = get_entity('person')  # cached, so okay to re-get for each loop
-            sel_res = perf_person.select(key_data(perf_data['person'], 'person'))
+        # note, all operations are done in a single transaction (see begin())
+        with self.begin() as trans:
+            # note, station record is cached (from insert_program_play())
+            sta_row = self.get_station_row(playlist.station)
+
+            comp_data = data['composer']
+            # NOTE: we always make sure there is a composer record (even if NONE or UNKNOWN), since work depends
+            # on it (and there is no play without work, haha)
+            if not comp_data.get('name'):
+                comp_data['name'] = NameVal.NONE
+            comp = get_entity('person')
+            sel_res = comp.select(key_data(comp_data, 'person'))
             if sel_res.rowcount == 1:
-                perf_person_row = sel_res.fetchone()
-                if perf_data['role'] not in COND_STRS and not perf_person_row.is_performer:
-                    perf_person.update(perf_person_row, {'is_performer': True})
+                comp_row = sel_res.fetchone()
+                if not comp_row.is_composer:
+                    comp.update(comp_row, {'is_composer': True})
             else:
-                perf_name = perf_data['person']['name']  # for convenience
-                log.trace("Inserting performer/person \"%s\" into musiclib" % (perf_name))
-                ins_res = perf_person.insert(perf_data['person'])
+                comp_name = comp_data['name']  # for convenience
+                log.trace("Inserting composer \"%s\" into musiclib" % (comp_name))
+                ins_res = comp.insert(comp_data)
                 if ins_res.rowcount == 0:
-                    raise RuntimeError("Could not insert performer/person \"%s\" into musiclib" % (perf_name))
-                perf_person_row = perf_person.inserted_row(ins_res)
-                if not perf_person_row:
-                    raise RuntimeError("Performer/person \"%s\" not in musiclib" % (perf_name))
-            perf_data['person_id'] = perf_person_row.id
-
-            # STEP 2 - now deal with performer record (since we have the person)
-            perf = get_entity('performer')  # cached, so okay to re-get for each loop
-            sel_res = perf.select(key_data(perf_data, 'performer'))
+                    raise RuntimeError("Could not insert composer/person \"%s\" into musiclib" % (comp_name))
+                comp_row = comp.inserted_row(ins_res)
+                if not comp_row:
+                    raise RuntimeError("Composer/person \"%s\" not in musiclib" % (comp_name))
+
+            work_data = data['work']
+            if not work_data.get('name'):
+                # REVISIT: for how, insert '<unknown>' work, just so we have a record of this and can
+                # try and identify the scenario (note, should really be logging to exception table)!!!
+                work_data['name'] = NameVal.UNKNOWN
+                #log.debug("Work name not specified, skipping...")
+                #return None
+            work_data['composer_id'] = comp_row.id
+            work = get_entity('work')
+            sel_res = work.select(key_data(work_data, 'work'))
             if sel_res.rowcount == 1:
-                perf_row = sel_res.fetchone()
+                work_row = sel_res.fetchone()
             else:
-                perf_name = perf_data['person']['name']  # for convenience
-                perf_role = perf_data['role']
-                perf_label = "\"%s\" [%s]" % (perf_name, perf_role)
-                log.trace("Inserting performer %s into musiclib" % (perf_label))
-                ins_res = perf.insert(entity_data(perf_data, 'performer'))
+                work_name = work_data['name']  # for convenience
+                log.trace("Inserting work \"%s\" into musiclib" % (work_name))
+                ins_res = work.insert(work_data)
                 if ins_res.rowcount == 0:
-                    raise RuntimeError("Could not insert performer %s into musiclib" % (perf_label))
-                perf_row = perf.inserted_row(ins_res)
+                    raise RuntimeError("Could not insert work/person \"%s\" into musiclib" % (work_name))
+                work_row = work.inserted_row(ins_res)
+                if not work_row:
+                    raise RuntimeError("Work/person \"%s\" not in musiclib" % (work_name))
+
+            cond_row = None
+            cond_data = data['conductor']
+            if cond_data.get('name'):
+                cond = get_entity('person')
+                sel_res = cond.select(key_data(cond_data, 'person'))
+                if sel_res.rowcount == 1:
+                    cond_row = sel_res.fetchone()
+                    if not cond_row.is_conductor:
+                        cond.update(cond_row, {'is_conductor': True})
+                else:
+                    cond_name = cond_data['name']  # for convenience
+                    log.trace("Inserting conductor \"%s\" into musiclib" % (cond_name))
+                    ins_res = cond.insert(cond_data)
+                    if ins_res.rowcount == 0:
+                        raise RuntimeError("Could not insert conductor/person \"%s\" into musiclib" % (cond_name))
+                    cond_row = cond.inserted_row(ins_res)
+                    if not cond_row:
+                        raise RuntimeError("Conductor/person \"%s\" not in musiclib" % (cond_name))
+
+            rec_row = None
+            rec_data = data['recording']
+            clean_user_keys(rec_data, 'recording')
+            clean_user_keys(rec_data, 'recording_alt')
+            if rec_data.get('label') and rec_data.get('catalog_no'):
+                rec = get_entity('recording')
+                sel_res = rec.select(key_data(rec_data, 'recording'))
+                if sel_res.rowcount == 1:
+                    rec_row = sel_res.fetchone()
+                else:
+                    rec_ident = "%s %s" % (rec_data['label'], rec_data['catalog_no'])  # for convenience
+                    log.trace("Inserting recording \"%s\" into musiclib" % (rec_ident))
+                    ins_res = rec.insert(rec_data)
+                    if ins_res.rowcount == 0:
+                        raise RuntimeError("Could not insert recording \"%s\" into musiclib" % (rec_ident))
+                    rec_row = rec.inserted_row(ins_res)
+                    if not rec_row:
+                        raise RuntimeError("Recording \"%s\" not in musiclib" % (rec_ident))
+            elif rec_data.get('name'):
+                rec = get_entity('recording')
+                sel_res = rec.select(key_data(rec_data, 'recording_alt'))
+                if sel_res.rowcount == 1:
+                    rec_row = sel_res.fetchone()
+                elif sel_res.rowcount > 1:
+                    # REVISIT: just pick the first one randomly???
+                    rec_row = sel_res.fetchone()
+                else:
+                    rec_name = rec_data['name']  # for convenience
+                    log.trace("Inserting recording \"%s\" into musiclib" % (rec_name))
+                    ins_res = rec.insert(rec_data)
+                    if ins_res.rowcount == 0:
+                        raise RuntimeError("Could not insert recording \"%s\" into musiclib" % (rec_name))
+                    rec_row = rec.inserted_row(ins_res, 'recording_alt')
+                    if not rec_row:
+                        raise RuntimeError("Recording \"%s\" not in musiclib" % (rec_name))
+
+            # note, existing person/performer/ensemble records are looked up in bulk (one query
+            # per entity), so individual queries are only needed for inserts (new entities);
+            # lookup maps are updated with inserted rows, in case of repeats within the play
+            perf_person = get_entity('person')
+            person_rows = {}
+            if data['performers']:
+                person_names = [perf_data['person'].get('name') for perf_data in data['performers']]
+                person_rows = perf_person.select_map({'name': person_names}, ('name',))
+            perf_person_rows = []
+            perf_person_upd = set()
+            for perf_data in data['performers']:
+                # STEP 1 -: insert/select underlying person record
+                perf_name = perf_data['person'].get('name')
+                perf_person_row = person_rows.get((perf_name,))
+                if perf_person_row:
+                    if perf_data['role'] not in COND_STRS and not perf_person_row.is_performer:
+                        if perf_person_row.id not in perf_person_upd:
+                            perf_person.update(perf_person_row, {'is_performer': True})
+                            perf_person_upd.add(perf_person_row.id)
+                else:
+                    log.trace("Inserting performer/person \"%s\" into musiclib" % (perf_name))
+                    ins_res = perf_person.insert(perf_data['person'])
+                    if ins_res.rowcount == 0:
+                        raise RuntimeError("Could not insert performer/person \"%s\" into musiclib" % (perf_name))
+                    perf_person_row = perf_person.inserted_row(ins_res)
+                    if not perf_person_row:
+                        raise RuntimeError("Performer/person \"%s\" not in musiclib" % (perf_name))
+                    person_rows[(perf_name,)] = perf_person_row
+                perf_data['person_id'] = perf_person_row.id
+                perf_person_rows.append(perf_person_row)
+
+            # STEP 2 - now deal with performer records (since we have the persons)
+            perf = get_entity('performer')
+            perf_map = {}
+            if perf_person_rows:
+                person_ids = [row.id for row in perf_person_rows]
+                perf_map = perf.select_map({'person_id': person_ids}, ('person_id', 'role'))
+            perf_rows = []
+            for perf_data in data['performers']:
+                perf_key = (perf_data['person_id'], perf_data['role'])
+                perf_row = perf_map.get(perf_key)
                 if not perf_row:
-                    raise RuntimeError("Performer %s not in musiclib" % (perf_label))
-            perf_rows.append(perf_row)
-
-        ens_rows = []
-        for ens_data in data['ensembles']:
-            ens = get_entity('ensemble')  # cached, so okay to re-get for each loop
-            sel_res = ens.select(key_data(ens_data, 'ensemble'))
-            if sel_res.rowcount == 1:
-                ens_row = sel_res.fetchone()
-            else:
-                ens_name = ens_data['name']  # for convenience
-                log.trace("Inserting ensemble \"%s\" into musiclib" % (ens_name))
-                ins_res = ens.insert(ens_data)
-                if ins_res.rowcount == 0:
-                    raise RuntimeError("Could not insert ensemble \"%s\" into musiclib" % (ens_name))
-                ens_row = ens.inserted_row(ins_res)
+                    perf_name = perf_data['person']['name']  # for convenience
+                    perf_role = perf_data['role']
+                    perf_label = "\"%s\" [%s]" % (perf_name, perf_role)
+                    log.trace("Inserting performer %s into musiclib" % (perf_label))
+                    ins_res = perf.insert(entity_data(perf_data, 'performer'))
+                    if ins_res.rowcount == 0:
+                        raise RuntimeError("Could not insert performer %s into musiclib" % (perf_label))
+                    perf_row = perf.inserted_row(ins_res)
+                    if not perf_row:
+                        raise RuntimeError("Performer %s not in musiclib" % (perf_label))
+                    perf_map[perf_key] = perf_row
+                perf_rows.append(perf_row)
+
+            ens = get_entity('ensemble')
+            ens_map = {}
+            if data['ensembles']:
+                ens_names = [ens_data.get('name') for ens_data in data['ensembles']]
+                ens_map = ens.select_map({'name': ens_names}, ('name',))
+            ens_rows = []
+            for ens_data in data['ensembles']:
+                ens_name = ens_data.get('name')
+                ens_row = ens_map.get((ens_name,))
                 if not ens_row:
-                    raise RuntimeError("Ensemble \"%s\" not in musiclib" % (ens_name))
-            ens_rows.append(ens_row)
-
-        play_new = False
-        play_row = None
-        play_data = data['play']
-        play_data['station_id']   = sta_row.id
-        play_data['prog_play_id'] = prog_play['id']
-        play_data['program_id']   = prog_play['program_id']
-        play_data['composer_id']  = comp_row.id
-        play_data['work_id']      = work_row.id
-        if cond_row:
-            play_data['conductor_id'] = cond_row.id
-        # NOTE: performer_ids and ensemble_ids are denorms, with no integrity checking
-        if perf_rows:
-            play_data['performer_ids'] = [perf_row.id for perf_row in perf_rows]
-        if ens_rows:
-            play_data['ensemble_ids'] = [ens_row.id for ens_row in ens_rows]
-        play = get_entity('play')
-        try:
-            ins_res = play.insert(play_data)
-            play_row = play.inserted_row(ins_res)
-            play_new = True
-            log.trace("Created play ID %d (%s, \"%s\", %s %s)" %
-                      (play_row.id, comp_row.name, work_row.name,
-                       play_row.play_date, play_row.play_start))
-        except IntegrityError:
-            # TODO: need to indicate duplicate to caller (currenty looks like an insert)!!!
-            log.debug("Skipping insert of duplicate play record:\n%s" % (play_data))
-            sel_res = play.select(key_data(play_data, 'play'))
-            if sel_res.rowcount == 1:
-                play_row = sel_res.fetchone()
-            else:
-                pass  # REVISIT: is this an internal error???
-
-        # write intersect records that are authoritative (denormed as arrays of keys, above)
-        play_perf_rows = []
-        play_ens_rows = []
-        if play_new:
-            for perf_row in perf_rows:
-                play_perf_data = {'play_id': play_row.id, 'performer_id': perf_row.id}
+                    log.trace("Inserting ensemble \"%s\" into musiclib" % (ens_name))
+                    ins_res = ens.insert(ens_data)
+                    if ins_res.rowcount == 0:
+                        raise RuntimeError("Could not insert ensemble \"%s\" into musiclib" % (ens_name))
+                    ens_row = ens.inserted_row(ins_res)
+                    if not ens_row:
+                        raise RuntimeError("Ensemble \"%s\" not in musiclib" % (ens_name))
+                    ens_map[(ens_name,)] = ens_row
+                ens_rows.append(ens_row)
+
+            play_new = False
+            play_row = None
+            play_data = data['play']
+            play_data['station_id']   = sta_row.id
+            play_data['prog_play_id'] = prog_play['id']
+            play_data['program_id']   = prog_play['program_id']
+            play_data['composer_id']  = comp_row.id
+            play_data['work_id']      = work_row.id
+            if cond_row:
+                play_data['conductor_id'] = cond_row.id
+            # NOTE: performer_ids and ensemble_ids are denorms, with no integrity checking
+            if perf_rows:
+                play_data['performer_ids'] = [perf_row.id for perf_row in perf_rows]
+            if ens_rows:
+                play_data['ensemble_ids'] = [ens_row.id for ens_row in ens_rows]
+            play = get_entity('play')
+            try:
+                ins_res = play.insert(play_data)
+                play_row = play.inserted_row(ins_res)
+                play_new = True
+                log.trace("Created play ID %d (%s, \"%s\", %s %s)" %
+                          (play_row.id, comp_row.name, work_row.name,
+                           play_row.play_date, play_row.play_start))
+            except IntegrityError:
+                # TODO: need to indicate duplicate to caller (currenty looks like an insert)!!!
+                log.debug("Skipping insert of duplicate play record:\n%s" % (play_data))
+                sel_res = play.select(key_data(play_data, 'play'))
+                if sel_res.rowcount == 1:
+                    play_row = sel_res.fetchone()
+                else:
+                    pass  # REVISIT: is this an internal error???
+
+            # write intersect records that are authoritative (denormed as arrays of keys, above)
+            play_perf_rows = []
+            play_ens_rows = []
+            if play_new:
                 play_perf = get_entity('play_performer')
-                try:
-                    ins_res = play_perf.insert(play_perf_data)
-                    play_perf_rows.append(play_perf.inserted_row(ins_res))
-                except IntegrityError:
-                    log.trace("Skipping insert of duplicate play_performer record:\n%s" % (play_perf_data))
+                for perf_row in perf_rows:
+                    play_perf_data = {'play_id': play_row.id, 'performer_id': perf_row.id}
+                    try:
+                        ins_res = play_perf.insert(play_perf_data)
+                        play_perf_rows.append(play_perf.inserted_row(ins_res))
+                    except IntegrityError:
+                        log.trace("Skipping insert of duplicate play_performer record:\n%s" % (play_perf_data))
 
-            for ens_row in ens_rows:
-                play_ens_data = {'play_id': play_row.id, 'ensemble_id': ens_row.id}
                 play_ens = get_entity('play_ensemble')
-                try:
-                    ins_res = play_ens.insert(play_ens_data)
-                    play_ens_rows.append(play_ens.inserted_row(ins_res))
-                except IntegrityError:
-                    log.trace("Skipping insert of duplicate play_ensemble record:\n%s" % (play_ens_data))
+                for ens_row in ens_rows:
+                    play_ens_data = {'play_id': play_row.id, 'ensemble_id': ens_row.id}
+                    try:
+                        ins_res = play_ens.insert(play_ens_data)
+                        play_ens_rows.append(play_ens.inserted_row(ins_res))
+                    except IntegrityError:
+                        log.trace("Skipping insert of duplicate play_ensemble record:\n%s" % (play_ens_data))
 
-        return {k: v for k, v in play_row.items()}
+            return dict(play_row)
 
     def insert_play_seq(self, play_rec, play_seq, hash_type):
         """
         :param play_rec:
         :param prog_seq:
         :param hash_type:
-        :return: list of key-value dict comprehensions for inserted play_seq fields
+        :return: list of key-value dicts for inserted play_seq fields
         """
-        ret = []
         ps = get_entity('play_seq')
+        ps_data = []
         while play_seq:
             level = len(play_seq)
             hashval = play_seq.pop(0)
-            data = {
+            ps_data.append({
                 'hash_level': level,
                 'hash_type' : hash_type,
                 'play_id'   : play_rec['id'],
                 'seq_hash'  : hashval
-            }
+            })
+        if not ps_data:
+            return []
 
-            try:
-                ins_res = ps.insert(data)
-                ps_row = ps.inserted_row(ins_res)
-                ret.append({k: v for k, v in ps_row.items()})
-            except IntegrityError:
-                log.debug("Could not insert play_seq %s into musiclib" % (data))
+        # insert all levels at once (the common case), falling back to inserting row-by-row
+        # if there are duplicates (e.g. play is being reprocessed); inserted rows come back
+        # from RETURNING in either case, so no requery is needed
+        try:
+            ins_res = ps.insert_many(ps_data)
+            ps_rows = ins_res.fetchall()
+        except IntegrityError:
+            ps_rows = []
+            for data in ps_data:
+                try:
+                    ins_res = ps.insert(data)
+                    ps_rows.append(ps.inserted_row(ins_res))
+                except IntegrityError:
+                    log.debug("Could not insert play_seq %s into musiclib" % (data))
 
-        return ret
+        # note, levels were inserted highest first, but RETURNING order is not guaranteed
+        ps_rows.sort(key=lambda ps_row: ps_row.hash_level, reverse=True)
+        return [dict(ps_row) for ps_row in ps_rows]
 
     def insert_entity_strings(self, playlist, data):
         """
-        :return: list of key-value dict comprehensions for inserted entity_string fields
+        :return: list of key-value dicts for inserted entity_string fields
         """
         ctx = playlist.parse_ctx
         ret = []
         es = get_entity('entity_string')
         for entity_src, src_strings in data.items():
             for entity_str in src_strings:
-                if not (entity_str and re.search('\w', entity_str)):
+                if not (entity_str and has_word_char(entity_str)):
+                    continue
+                es_key = (entity_str, entity_src, ctx['station_id'])
+                if es_key in self.es_keys:
+                    log.trace("Skipping known entity_string \"%s\" [%s] for station ID %d" %
+                              (entity_str, entity_src, ctx['station_id']))
                     continue
                 ent_str_data = {
                     'entity_str'  : entity_str,
@@ -1283,16 +1682,17 @@ class MusicLib(object):
                 try:
                     ins_res = es.insert(ent_str_data)
                     es_row = es.inserted_row(ins_res)
-                    ret.append({k: v for k, v in es_row.items()})
+                    ret.append(dict(es_row))
                 except IntegrityError:
                     log.trace("Duplicate entity_string \"%s\" [%s] for station ID %d" %
                               (entity_str, entity_src, ctx['station_id']))
+                self.es_keys.add(es_key)
 
         return ret
 
     def insert_entity_ref(self, refdata, ent_data, ent_refs, raw_name = None):
         """
-        :return: key-value dict comprehension for inserted entity_ref fields
+        :return: key-value dict for inserted entity_ref fields
         """
         #ctx = refdata.parse_ctx
         ent_name = ent_data['entity_ref']
@@ -1304,11 +1704,17 @@ class MusicLib(object):
         try:
             ins_res = er.insert(ent_data)
             es_row = er.inserted_row(ins_res)
-            ret.append({k: v for k, v in es_row.items()})
+            ret.append(dict(es_row))
         except IntegrityError:
             log.trace("Duplicate entity name \"%s\" [%s] for refdata \"%s\"" %
                       (ent_name, ent_type, ref_source))
 
+        # invalidate cached lookups for the strings we are (potentially) adding
+        ent_type_cache.pop(ent_name, None)
+        for ref_str in ent_refs:
+            ent_type_cache.pop(ref_str, None)
+        examine_cache.clear()
+
         ent_ref_data = ent_data.copy()
         del ent_ref_data['is_entity']
         for ref_str in ent_refs:
@@ -1323,7 +1729,7 @@ class MusicLib(object):
             try:
                 ins_res = er.insert(ent_ref_data)
                 es_row = er.inserted_row(ins_res)
-                ret.append({k: v for k, v in es_row.items()})
+                ret.append(dict(es_row))
             except IntegrityError:
                 log.trace("Duplicate entity_ref \"%s\" [%s] for refdata \"%s\"" %
                           (ref_str, ent_type, ref_source))
@@ -1336,7 +1742,7 @@ class MusicLib(object):
         :param flags: [int/bitfield] later
         :return: ml_dict of parsed data
         """
-        if not comp_str or not re.search(r'\w', comp_str):
+        if not comp_str or not has_word_char(comp_str):
             return {}
 
         ctx = StringCtx(comp_str, flags | ParseFlag.COMPOSER)
@@ -1353,7 +1759,7 @@ class MusicLib(object):
         :param flags: [int/bitfield] later
         :return: ml_dict of parsed data
         """
-        if not work_str or not re.search(r'\w', work_str):
+        if not work_str or not has_word_char(work_str):
             return {}
 
         ctx = StringCtx(work_str, flags | ParseFlag.WORK)
@@ -1370,7 +1776,7 @@ class MusicLib(object):
         :param flags: [int/bitfield] later
         :return: ml_dict of parsed data
         """
-        if not cond_str or not re.search(r'\w', cond_str):
+        if not cond_str or not has_word_char(cond_str):
             return {}
 
         ctx = StringCtx(cond_str, flags | ParseFlag.CONDUCTOR)
@@ -1396,7 +1802,7 @@ class MusicLib(object):
         :param flags: (not yet implemented)
         :return: list of perf_data structures (see LATER above)
         """
-        if not perf_str or not re.search(r'\w', perf_str):
+        if not perf_str or not has_word_char(perf_str):
             return {}
 
         ctx = StringCtx(perf_str, flags | ParseFlag.PERFORMER)
@@ -1428,35 +1834,22 @@ class MusicLib(object):
             return {'performers': sub_perfs, 'conductor': sub_cond} if sub_cond \
                    else {'performers': sub_perfs}
 
-        ens_data  = []
-        perf_data = []
-        ret_data  = ml_dict({'ensembles': ens_data, 'performers': perf_data})
-        """
-        # TODO: should really move the quote processing as far upstream as possible (for
-        # all fields); NOTE: also need to revisit normalize_* functions in musiclib!!!
-        m = re.fullmatch(r'"([^"]*)"', perf_str)
-        if m:
-            log.debug("PFS_RULE 1 - strip enclosing quotes \"%s\"" % (perf_str))
-            perf_str = m.group(1)  # note: could be empty string, handle downstream!
-        m = re.fullmatch(r'\((.*[^)])\)?', perf_str)
-        if m:
-            log.debug("PFS_RULE 2 - strip enclosing parens \"%s\"" % (perf_str))
-            perf_str = m.group(1)  # note: could be empty string, handle downstream!
-        """
+        ret_data = ml_dict.from_keys(ENS_PERF_KEYS)
         # TODO: genericize performer/person/role stuff (note, ctx.ent_str not updated below)!!!
         perf_str = ctx.ent_str
 
-        # special case for ugly record (WNED 2018-09-17)
-        m = re.match(r'(.+?)\r', perf_str)
+        # special case for ugly record (WNED 2018-09-17); note, the literal character tests
+        # here and below avoid running the patterns on strings that cannot match
+        m = BROKEN_REC_PTRN.match(perf_str) if '\r' in perf_str else None
         if m:
             log.debug("PFS_RULE 3 - ugly broken record for WNED \"%s\"" % (perf_str))
             perf_str = m.group(1)
-            m = re.match(r'(.+)\[(.+)\],(.+)', perf_str)
+            m = BROKEN_ROLE_PTRN.match(perf_str)
             if m:
                 perf_str = '; '.join(m.groups())
 
         # pattern used by IPR, VPR, WIAA, WNED
-        if re.match(r'\/.+ \- ', perf_str):
+        if perf_str.startswith('/') and SLASH_PERF_PTRN.match(perf_str):
             log.debug("PFS_RULE 4 - leading slash for performer fields \"%s\"" % (perf_str))
             for perf_item in perf_str.split('/'):
                 if perf_item:
@@ -1478,7 +1871,7 @@ class MusicLib(object):
         :param flags: (not yet implemented)
         :return: dict of ens_data/perf_data structures, indexed by type
         """
-        if not ens_str or not re.search(r'\w', ens_str):
+        if not ens_str or not has_word_char(ens_str):
             return {}
 
         ctx = StringCtx(ens_str, flags | ParseFlag.ENSEMBLE)
@@ -1487,15 +1880,18 @@ class MusicLib(object):
         def parse_ens_item(ens_item, fld_delim = ','):
             sub_ens_data = []
             sub_perf_data = []
-            if ens_item.count(fld_delim) % 2 == 1:
-                fields = ens_item.split(fld_delim)
-                while fields:
-                    name, role = (fields.pop(0), fields.pop(0))
+            fields = ens_item.split(fld_delim)
+            # note: odd number of field delimiters means even number of fields
+            if len(fields) % 2 == 0:
+                for i in range(0, len(fields), 2):
+                    name, role = fields[i], fields[i + 1]
                     # TEMP: if role starts with a capital letter, assume the whole string
                     # is an ensemble (though in reality, it may be two--we'll deal with
                     # that later, when we have NER), otherwise treat as performer/role!!!
                     #if re.match(r'[A-Z]', role[0]):
-                    if re.match(r'\p{Lu}', role[0]):
+                    # note: category() is the same test as regex '\p{Lu}' (str.isupper() also
+                    # accepts non-letter "Other_Uppercase" characters, e.g. circled letters)
+                    if role and category(role[0]) == 'Lu':
                         sub_ens_data.append(ctx.mkens(name))
                     else:
                         sub_perf_data.append(ctx.mkperf(name, role))
@@ -1508,25 +1904,26 @@ class MusicLib(object):
         def parse_ens_fields(fields):
             sub_ens_data = []
             sub_perf_data = []
-            while fields:
-                if len(fields) == 1:
-                    sub_ens_data.append(ctx.mkens(fields.pop(0)))
+            # note, we walk the fields by index (two at a time) rather than popping them
+            i = len(fields)
+            while i > 0:
+                if i == 1:
+                    sub_ens_data.append(ctx.mkens(fields[0]))
                     break  # same as continue
                 # more reliable to do this moving backward from the end (sez me)
-                if ' ' not in fields[-1]:
+                if ' ' not in fields[i - 1]:
                     # REVISIT: we presume a single-word field to be a city/location (for now);
                     # as above, we should really look at field contents to properly parse!!!
-                    ens = ','.join([fields.pop(-2), fields.pop(-1)])
+                    ens = ','.join(fields[i - 2:i])
                     sub_ens_data.append(ctx.mkens(ens))
                 else:
                     # yes, do this twice!
-                    sub_ens_data.append(ctx.mkens(fields.pop(-1)))
-                    sub_ens_data.append(ctx.mkens(fields.pop(-1)))
+                    sub_ens_data.append(ctx.mkens(fields[i - 1]))
+                    sub_ens_data.append(ctx.mkens(fields[i - 2]))
+                i -= 2
             return {'ensembles' : sub_ens_data, 'performers': sub_perf_data}
 
-        ens_data  = []
-        perf_data = []
-        ret_data  = ml_dict({'ensembles': ens_data, 'performers': perf_data})
+        ret_data = ml_dict.from_keys(ENS_PERF_KEYS)
         if ';' in ens_str:
             for ens_item in ens_str.split(';'):
                 if ens_item:
@@ -1535,8 +1932,7 @@ class MusicLib(object):
             ens_fields = ens_str.split(',')
             ret_data.merge(parse_ens_fields(ens_fields))
         else:
-            # ens_data is implcitly part of ret_data
-            ens_data.append(ctx.mkens(ens_str))
+            ret_data['ensembles'].append(ctx.mkens(ens_str))
 
         return ret_data
 #####################
@@ -12,14 +12,14 @@ import datetime as dt
 from urllib.parse import urlsplit, parse_qs
 
 import pytz
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from core import cfg, env, log, dbg_hand, DFLT_HTML_PARSER
 
-from musiclib import MusicLib, StringCtx, SKIP_ENS, ml_dict, UNIDENT
+from musiclib import MusicLib, StringCtx, SKIP_ENS, ml_dict, UNIDENT, NameVal
 from datasci import HashSeq
-from utils import (LOV, prettyprint, str2date, date2str, str2time, time2str, datetimetz,
-                   strtype, collecttype)
+from utils import (LOV, prettyprint, str2date, date2str, str2time, ampm2time, time2str,
+                   datetimetz, strtype, collecttype)
 
 ##############################
 # common constants/functions #
@@ -37,6 +37,20 @@ NOPRINT_KEYS = {'parsed_info'}
 PLStatus = LOV(['NEW',
                 'PARSED'], 'lower')
 
+# ParserMPR only uses the page title and the playlist 'dl' (skip building the rest)
+MPR_STRAINER       = SoupStrainer(['title', 'dl'])
+
+# ParserMPR patterns
+MPR_TITLE_PTRN     = re.compile(r'Playlist for (\w+ \d+, \d+)')
+MPR_PROG_PTRN      = re.compile(r'(\d+:\d+ (?:AM|PM)).+?(\d+:\d+ (?:AM|PM))')
+
+# ParserC24 patterns
+C24_DATE_PTRN      = re.compile(r'(\w+), (\w+ {1,2}\d+, \d+) (.+)')
+C24_PROG_PTRN      = re.compile(r'(\d+(?:AM|PM)).+?(\d+(?:AM|PM))')
+C24_REC_CTR_PTRN   = re.compile(r'\s+\-\s+$')
+C24_LABEL_PTRN     = re.compile(r'(.*\S) (\w+)')
+C24_PERF_ROLE_PTRN = re.compile(r'(.+), ([\w\./ \'-]+)')
+
 ##################
 # Playlist class #
 ##################
@@ -127,9 +141,17 @@ class Parser(object):
         directives), so constructor doesn't really do anything
         """
         self.station = sta
-        self.html_parser = env.get('html_parser') or DFLT_HTML_PARSER
+        # station timezone, for localizing playlist dates/times
+        self.tz = pytz.timezone(sta.timezone)
+        self.html_parser = sta.html_parser or env.get('html_parser') or DFLT_HTML_PARSER
         log.debug("HTML parser: %s" % (self.html_parser))
         self.ml = MusicLib()
+        # entity string parsers, by entity_str_data key (in order of application)
+        self.ent_parsers = (('composer',   self.ml.parse_composer_str),
+                            ('work',       self.ml.parse_work_str),
+                            ('conductor',  self.ml.parse_conductor_str),
+                            ('performers', self.ml.parse_performer_str),
+                            ('ensembles',  self.ml.parse_ensemble_str))
 
     def iter_program_plays(self, playlist):
         """Iterator for program plays within a playlist, yield value is passed into
@@ -182,29 +204,30 @@ class Parser(object):
             playlist.parse_ctx['play_id']      = None
             pp_rec['plays'] = []
 
-            # Step 2 - Parse out play info (if present)
+            # Step 2 - Parse out play info (if present); note, all plays for the program are
+            # parsed and sequence-hashed (in memory) before any are written to the database
+            plays = []
             for play in self.iter_plays(prog):
                 play_norm, entity_str_data = self.map_play(pp_norm['program_play'], play)
                 # APOLOGY: perhaps this parsing of entity strings and merging into normalized
                 # play data really belongs in the subclasses, but just hate to see all of the
                 # exact replication of code--thus, we have this ugly, ill-defined interface,
                 # oh well... (just need to be careful here)
-                for composer_str in entity_str_data['composer']:
-                    if composer_str:
-                        play_norm.merge(self.ml.parse_composer_str(composer_str))
-                for work_str in entity_str_data['work']:
-                    if work_str:
-                        play_norm.merge(self.ml.parse_work_str(work_str))
-                for conductor_str in entity_str_data['conductor']:
-                    if conductor_str:
-                        play_norm.merge(self.ml.parse_conductor_str(conductor_str))
-                for performers_str in entity_str_data['performers']:
-                    if performers_str:
-                        play_norm.merge(self.ml.parse_performer_str(performers_str))
-                for ensembles_str in entity_str_data['ensembles']:
-                    if ensembles_str:
-                        play_norm.merge(self.ml.parse_ensemble_str(ensembles_str))
+                merge = play_norm.merge
+                for key, parse_str in self.ent_parsers:
+                    for ent_str in filter(None, entity_str_data[key]):
+                        merge(parse_str(ent_str))
+
+                # note, same name defaults as applied by insert_play()
+                comp_name = play_norm['composer'].get('name') or NameVal.NONE
+                work_name = play_norm['work'].get('name') or NameVal.UNKNOWN
+                play_name = "%s - %s" % (comp_name, work_name)
+                # TODO: create separate hash sequence for top of each hour!!!
+                play_seq = playlist.hash_seq.add(play_name)
+                plays.append((play_norm, entity_str_data, play_seq))
 
+            # Step 3 - Write plays (and associated entity strings and sequence hashes)
+            for play_norm, entity_str_data, play_seq in plays:
                 play_rec = self.ml.insert_play(playlist, pp_rec, play_norm)
                 if not play_rec:
                     raise RuntimeError("Could not insert play")
@@ -213,9 +236,6 @@ class Parser(object):
 
                 es_recs = self.ml.insert_entity_strings(playlist, entity_str_data)
 
-                play_name = "%s - %s" % (play_norm['composer']['name'], play_norm['work']['name'])
-                # TODO: create separate hash sequence for top of each hour!!!
-                play_seq = playlist.hash_seq.add(play_name)
                 if play_seq:
                     ps_recs = self.ml.insert_play_seq(play_rec, play_seq, 1)
                 else:
@@ -323,7 +343,7 @@ class ParserWWFM(Parser):
             log.debug("Start time mismatch %s != %s" % (stime, data['start_time']))
         if etime != data['end_time']:
             log.debug("End time mismatch %s != %s" % (etime, data['end_time']))
-        tz = pytz.timezone(self.station.timezone)
+        tz = self.tz
 
         pp_data = {}
         # TODO: appropriate fixup of data (e.g. NULL chars) for prog_play_info!!!
@@ -373,7 +393,7 @@ class ParserWWFM(Parser):
         #    log.debug("End time mismatch %s != %s" % (etime, raw_data['end_time']))
 
         dur_msecs = raw_data.get('_duration')
-        tz = pytz.timezone(self.station.timezone)
+        tz = self.tz
 
         # special fix-up for NULL characters in recording name (WXXI)
         rec_name = raw_data.get('collectionName')
@@ -443,10 +463,10 @@ class ParserMPR(Parser):
         """
         log.debug("Parsing html for %s", os.path.relpath(playlist.file, playlist.station.station_dir))
         with open(playlist.file) as f:
-            soup = BeautifulSoup(f, self.html_parser)
+            soup = BeautifulSoup(f, self.html_parser, parse_only=MPR_STRAINER)
 
         title = soup.title.string.strip()
-        m = re.match(r'Playlist for (\w+ \d+, \d+)', title)
+        m = MPR_TITLE_PTRN.match(title)
         if not m:
             raise RuntimeError("Could not parse title \"%s\"" % (title))
         pl_date = dt.datetime.strptime(m.group(1), '%B %d, %Y').date()
@@ -479,12 +499,12 @@ class ParserMPR(Parser):
         """
         pl_date, prog_head = prog_info
         prog_name = prog_head.h2.string.strip()
-        m = re.match(r'(\d+:\d+ (?:AM|PM)).+?(\d+:\d+ (?:AM|PM))', prog_name)
-        start_time = dt.datetime.strptime(m.group(1), '%I:%M %p').time()
-        end_time   = dt.datetime.strptime(m.group(2), '%I:%M %p').time()
+        m = MPR_PROG_PTRN.match(prog_name)
+        start_time = ampm2time(m.group(1), '%I:%M %p')
+        end_time   = ampm2time(m.group(2), '%I:%M %p')
         start_date = pl_date
         end_date   = pl_date if end_time > start_time else pl_date + dt.timedelta(1)
-        tz         = pytz.timezone(self.station.timezone)
+        tz         = self.tz
         # TODO: lookup host name from refdata!!!
         prog_data = {'name': prog_name}
 
@@ -523,7 +543,7 @@ class ParserMPR(Parser):
         start_time = play_start.string + ' ' + time2str(pp_start, '%p')
         raw_data['start_date'] = start_date  # %Y-%m-%d
         raw_data['start_time'] = start_time  # %I:%M %p (12-hour format)
-        tz = pytz.timezone(self.station.timezone)
+        tz = self.tz
 
         buy_button = play_head.find('a', class_="buy-button", href=True)
         if (buy_button):
@@ -553,7 +573,7 @@ class ParserMPR(Parser):
         # TODO: better conversion of play_head/play_body into dict for play_info!!!
         play_data['play_info']  = raw_data
         play_data['play_date']  = str2date(raw_data['start_date'])
-        play_data['play_start'] = str2time(raw_data['start_time'], '%I:%M %p')
+        play_data['play_start'] = ampm2time(raw_data['start_time'], '%I:%M %p')
         play_data['play_end']   = None # Time
         play_data['play_dur']   = None # Interval
         play_data['notes']      = None # ARRAY(Text)
@@ -602,7 +622,7 @@ class ParserC24(Parser):
 
         title = pl_head.find('span', class_='title')
         datestr = title.find_next_sibling('i').string  # "Monday, September 17, 2018 Central Time"
-        m = re.match(r'(\w+), (\w+ {1,2}\d+, \d+) (.+)', datestr)
+        m = C24_DATE_PTRN.match(datestr)
         if not m:
             raise RuntimeError("Could not parse datestr \"%s\"" % (datestr))
         pl_date = dt.datetime.strptime(m.group(2), '%B %d, %Y').date()
@@ -623,11 +643,13 @@ class ParserC24(Parser):
         :yield: bs4 'table' tag
         """
         pl_date, prog_div, prog_head = prog
-        play_heads = prog_div.find_next_siblings(['table', 'div'])
-        for play_head in play_heads:
+        # note, walk the siblings lazily (rather than collecting all of the following
+        # siblings for the rest of the playlist), since we stop at the next program 'div'
+        for play_head in prog_div.next_siblings:
             if play_head.name == 'div':
                 break
-            yield play_head
+            if play_head.name == 'table':
+                yield play_head
         return
 
     def map_program_play(self, prog_info):
@@ -642,14 +664,14 @@ class ParserC24(Parser):
         pl_date, prog_div, prog_head = prog_info
         prog_name = prog_head.string.strip()  # "MID -  1AM"
         prog_times = prog_name.replace('MID', '12AM').replace('12N', '12PM')
-        m = re.match(r'(\d+(?:AM|PM)).+?(\d+(?:AM|PM))', prog_times)
+        m = C24_PROG_PTRN.match(prog_times)
         if not m:
             raise RuntimeError("Could not parse prog_times \"%s\"" % (prog_times))
-        start_time = dt.datetime.strptime(m.group(1), '%I%p').time()
-        end_time   = dt.datetime.strptime(m.group(2), '%I%p').time()
+        start_time = ampm2time(m.group(1), '%I%p')
+        end_time   = ampm2time(m.group(2), '%I%p')
         start_date = pl_date
         end_date   = pl_date if end_time > start_time else pl_date + dt.timedelta(1)
-        tz         = pytz.timezone(self.station.timezone)
+        tz         = self.tz
         # TODO: lookup host name from refdata!!!
         prog_data = {'name': prog_name}
 
@@ -695,18 +717,20 @@ class ParserC24(Parser):
         start_time = play_start.string.strip()  # "12:01AM"
         raw_data['start_date'] = start_date  # %Y-%m-%d
         raw_data['start_time'] = start_time  # %I:%M%p (12-hour format)
-        tz = pytz.timezone(self.station.timezone)
+        tz = self.tz
 
         # Step 2a - try and find label information (<i>...</i> - <a href=...>)
-        rec_center = play_body.find(string=re.compile(r'\s+\-\s+$'))
+        rec_center = play_body.find(string=C24_REC_CTR_PTRN)
         rec_listing = rec_center.previous_sibling
         # "<label> <cat>" may be absent, in which case rec_listing is an empty <br/> tag
-        if rec_listing.string:
-            m = re.fullmatch(r'(.*\S) (\w+)', rec_listing.string)
+        label_str = rec_listing.string
+        # note, pattern requires a space separator, so skip the regex if there is none
+        if label_str and ' ' in label_str:
+            m = C24_LABEL_PTRN.fullmatch(label_str)
             if m:
                 raw_data['label'] = m.group(1)
                 raw_data['catalog_no'] = m.group(2)
-                processed.add(rec_listing.string)
+                processed.add(label_str)
         rec_buy_url = rec_center.next_sibling
         # Step 2b - get as much info as we can from the "BUY" url
         if rec_buy_url.name == 'a':
@@ -746,7 +770,7 @@ class ParserC24(Parser):
                 continue
             # REVISIT: this is hacky--the apostrophe matches "oboe d'amore" and the hyphen
             # matches "mezzo-soprano"; need to replace this with real entity recognition!!!
-            m = re.fullmatch(r'(.+), ([\w\./ \'-]+)', field.string)
+            m = C24_PERF_ROLE_PTRN.fullmatch(field.string)
             if m:
                 # note, we will let parse_performer_str() determine whether role is conductor,
                 # ensemble, etc.
@@ -781,7 +805,7 @@ class ParserC24(Parser):
         # TODO: better conversion of play_head/play_body into dict for play_info!!!
         play_data['play_info']  = raw_data
         play_data['play_date']  = str2date(raw_data['start_date'])
-        play_data['play_start'] = str2time(raw_data['start_time'], '%I:%M%p')
+        play_data['play_start'] = ampm2time(raw_data['start_time'], '%I:%M%p')
         play_data['play_end']   = None # Time
         play_data['play_dur']   = None # Interval
         play_data['notes']      = None # ARRAY(Text)
@@ -64,6 +64,12 @@ CatDataAttr    = LOV(['FILE',
 CatDataStatus  = LOV(['OK',
                       'NOTOK'], 'lower')
 
+# special-case name patterns (for bad formatting somewhere upstream), see parse_chunk()
+ADDL_REF_PTRN       = re.compile(r'(.+) \[(.*)\]')
+SPLIT_ROLE_PTRN     = re.compile(r'(%s), (%s)\] (%s) \[(%s)' % (NAME_RE, ROLE_RE, NAME_RE, ROLE_RE))
+MISPLACED_ROLE_PTRN = re.compile(r'(%s) \[(%s)\],? (%s)' % (NAME_RE, ROLE_RE2, NAME_RE))
+HIS_ORCH_PTRN       = re.compile(r'(%s), (%s) (& .+)' % (NAME_RE, NAME_RE))
+
 #################
 # RefData class #
 #################
@@ -342,31 +348,28 @@ class RefData(object):
             # aberrations to begin with)!!!
             if '[' in name:
                 # can be liberal in parsing here (compared to special case below)
-                m = re.fullmatch(r'(.+) \[(.*)\]', name)
+                m = ADDL_REF_PTRN.fullmatch(name)
                 if m:
                     name = m.group(1)
                     addl_ref = m.group(2)
                 if not m:
                     # special case (for bad formatting somewhere upstream):
                     #   "Keckler, Vocals] Joseph [Piano" -> "Keckler, Joseph [Piano/Vocals]"
-                    pattern = r'(%s), (%s)\] (%s) \[(%s)' % (NAME_RE, ROLE_RE, NAME_RE, ROLE_RE)
-                    m = re.fullmatch(pattern, name)
+                    m = SPLIT_ROLE_PTRN.fullmatch(name)
                     if m:
                         name = "%s, %s" % (m.group(1), m.group(3))
                         addl_ref = "%s/%s" % (m.group(4), m.group(2))
                 if not m:
                     # special case (for bad formatting somewhere upstream):
                     #   "Bilan, Jr. [Xylophone] Ladislav" -> "Ladislav Bilan, Jr. [Xylophone]"
-                    pattern = r'(%s) \[(%s)\],? (%s)' % (NAME_RE, ROLE_RE2, NAME_RE)
-                    m = re.fullmatch(pattern, name)
+                    m = MISPLACED_ROLE_PTRN.fullmatch(name)
                     if m:
                         name = "%s, %s" % (m.group(1), m.group(3))
                         addl_ref = m.group(2)
 
             if '&' in name:
                 # special case: "Jenkins, Gordon & His Orchestra" (just do a rough parse)
-                pattern = r'(%s), (%s) (& .+)' % (NAME_RE, NAME_RE)
-                m = re.fullmatch(pattern, name)
+                m = HIS_ORCH_PTRN.fullmatch(name)
                 if m:
                     name = "%s %s %s" % (m.group(2), m.group(1), m.group(3))
 
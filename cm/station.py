@@ -44,6 +44,7 @@ ConfigKey      = LOV(['URLS',
                       'HTTP_HEADERS',
                       'FETCH_INTERVAL',
                       'PARSER_CLS',
+                      'HTML_PARSER',
                       'SYND_LEVEL'], 'lower')
 REQD_CFG_ATTRS = {ConfigKey.TIMEZONE,
                   ConfigKey.PLAYLIST_EXT,
@@ -162,6 +163,8 @@ class Station(object):
         self.station_info_file = os.path.join(self.station_dir, 'station_info.json')
         self.playlists_file    = os.path.join(self.station_dir, 'playlists.json')
         self.playlist_dir      = os.path.join(self.station_dir, 'playlists')
+        # note, optional station-level override of HTML parser (needed by Parser.get())
+        self.html_parser       = self.config.get(ConfigKey.HTML_PARSER)
         self.parser            = Parser.get(self)
         # UGLY: it's not great that we are treating these attributes differently than REQD_CFG_ATTRS
         # (which are accessed implicitly through __getattr__()), but leave it this way for now!!!
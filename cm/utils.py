@@ -2,7 +2,8 @@
 """
 """
 
-from collections import Mapping, Collection
+from collections import OrderedDict
+from collections.abc import Mapping, Collection
 import regex as re
 import json
 import datetime as dt
@@ -95,6 +96,35 @@ class LOV(object):
         """
         return set(self._mydict.values())
 
+class LRUCache(OrderedDict):
+    """Dict with a maximum number of entries; when full, the least recently used entry
+    (set or fetched via get()) is evicted
+    """
+    def __init__(self, maxsize):
+        """
+        :param maxsize: maximum number of entries
+        """
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key, default = None):
+        """
+        :param key: cache key
+        :param default: returned if key is not in cache
+        :return: cached value (which is then marked as most recently used)
+        """
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
 
 ##################
 # util functions #
@@ -105,13 +135,22 @@ STD_DATE_FMT  = '%Y-%m-%d'
 STD_TIME_FMT  = '%H:%M:%S'
 STD_TIME_FMT2 = '%H:%M'
 
+# parsed dates by (datestr, fmt), since the same date strings are parsed for every play
+# in a playlist (dt.date objects are immutable, so can be shared)
+date_cache = {}
+
 def str2date(datestr, fmt = STD_DATE_FMT):
     """
     :param datestr: string
     :param fmt: [optional] defaults to Y-m-d
     :return: dt.date object
     """
-    return dt.datetime.strptime(datestr, fmt).date()
+    cache_key = (datestr, fmt)
+    date = date_cache.get(cache_key)
+    if date is None:
+        date = dt.datetime.strptime(datestr, fmt).date()
+        date_cache[cache_key] = date
+    return date
 
 def date2str(date, fmt = STD_DATE_FMT):
     """
@@ -131,6 +170,33 @@ def str2time(timestr, fmt = STD_TIME_FMT):
         fmt = STD_TIME_FMT2
     return dt.datetime.strptime(timestr, fmt).time()
 
+# 12-hour clock formats handled by ampm2time(), mapped to (has minutes, space before AM/PM)
+AMPM_FORMATS = {'%I%p'     : (False, False),
+                '%I:%M%p'  : (True,  False),
+                '%I:%M %p' : (True,  True)}
+AMPM_TIME_PTRN = re.compile(r'([0-9]{1,2})(?::([0-9]{2}))?( ?)([AaPp][Mm])')
+
+def ampm2time(timestr, fmt):
+    """Parse 12-hour clock strings directly (rather than with strptime()); the string must
+    match fmt exactly (note, this is stricter than strptime(), which also accepts one-digit
+    minutes, and any whitespace for the space before AM/PM)
+
+    :param timestr: string (e.g. "1AM", "12:01AM", "12:01 PM")
+    :param fmt: one of "%I%p", "%I:%M%p", or "%I:%M %p"
+    :return: dt.time object
+    """
+    if fmt not in AMPM_FORMATS:
+        raise RuntimeError("Unsupported 12-hour time format \"%s\"" % (fmt))
+    has_minute, has_space = AMPM_FORMATS[fmt]
+    m = AMPM_TIME_PTRN.fullmatch(timestr)
+    if not m or bool(m.group(2)) != has_minute or bool(m.group(3)) != has_space:
+        raise ValueError("Time string \"%s\" does not match format \"%s\"" % (timestr, fmt))
+    hour = int(m.group(1))
+    minute = int(m.group(2)) if has_minute else 0
+    if not 1 <= hour <= 12 or minute > 59:
+        raise ValueError("Invalid 12-hour time string \"%s\"" % (timestr))
+    return dt.time(hour % 12 + (12 if m.group(4).upper() == 'PM' else 0), minute)
+
 def time2str(time, fmt = STD_TIME_FMT):
     """
     :param time: dt.time object
@@ -188,7 +254,9 @@ def truthy(val):
         return bool(val)
 
 def str_similarity(a, b):
-    """
+    """Note that python-Levenshtein is a C extension (unlike difflib, below), so callers
+    can use this freely for pairwise name scoring
+
     :return: float (ratio) in the range [0, 1]
     """
     return Levenshtein.ratio(a, b)